@@ -1,19 +1,68 @@
-from dataclasses import dataclass
-from typing import Optional
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from importlib import import_module
+import mmap
+from pathlib import Path
+from typing import Any, Optional
 
 
 @dataclass
 class Solution:
+    # Override the default `inputs/<name>.txt` location
+    input_path: Optional[str] = None
+    # Yield input lines lazily rather than reading them all up front
+    stream: bool = False
+    _parsed: Any = field(default=None, init=False, repr=False)
+
     @property
     def name(self) -> str:
         # Two digit day, e.g. "04"
         raise NotImplementedError
 
+    @property
+    def path(self) -> str:
+        return self.input_path or f"inputs/{self.name}.txt"
+
     def read(self):
-        with open(f"inputs/{self.name}.txt", encoding="utf-8") as f:
+        if self.stream:
+            return self.read_lines()
+
+        with open(self.path, encoding="utf-8") as f:
             puzzle_input = f.readlines()
         return puzzle_input
 
+    def read_lines(self) -> Iterator[str]:
+        """Lazily yield lines of the input file, one at a time"""
+        with open(self.path, encoding="utf-8") as f:
+            yield from f
+
+    @contextmanager
+    def read_mmap(self) -> Iterator[mmap.mmap]:
+        """Memory-map the input file for read-only access"""
+        with open(self.path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                yield mm
+
+    def parse(self, puzzle_input):
+        """Convert the raw puzzle input into the structure consumed
+        by both parts. Days that don't override this receive the
+        raw lines.
+        """
+        if isinstance(puzzle_input, Iterator):
+            # A stream can only be consumed once, hold onto
+            # the lines so both parts see them
+            return list(puzzle_input)
+        return puzzle_input
+
+    def load(self):
+        """Read and parse the puzzle input, caching the result
+        so it's shared between both parts
+        """
+        if self._parsed is None:
+            self._parsed = self.parse(self.read())
+        return self._parsed
+
     def part_one(self, puzzle_input):
         raise NotImplementedError
 
@@ -28,11 +77,34 @@ class Solution:
         part_two = (part == 2) or (part is None)
 
         if part_one:
-            input_one = self.read()
-            solution_one = self.part_one(input_one)
-            print(f"Soln part one: {solution_one}")
+            solution_one = self.part_one(self.load())
+            print(f"Soln part one: {_format_answer(solution_one)}")
 
         if part_two:
-            input_two = self.read()
-            solution_two = self.part_two(input_two)
-            print(f"Soln part two: {solution_two}")
+            solution_two = self.part_two(self.load())
+            print(f"Soln part two: {_format_answer(solution_two)}")
+
+
+def _format_answer(answer: Any) -> str:
+    """Start multi-line answers (e.g. the Day10 screen) on their own line"""
+    text = str(answer)
+    return "\n" + text if "\n" in text else text
+
+
+def discover_solutions() -> dict[str, type[Solution]]:
+    """Import every `src/day_NN.py` module and return the
+    Solution subclass it defines, keyed by two digit day
+    """
+    solutions: dict[str, type[Solution]] = {}
+    for path in sorted(Path(__file__).parent.glob("day_*.py")):
+        module = import_module(f"src.{path.stem}")
+        for obj in vars(module).values():
+            if (
+                isinstance(obj, type)
+                and issubclass(obj, Solution)
+                and obj is not Solution
+                and obj.__module__ == module.__name__
+            ):
+                solutions[obj.name] = obj
+
+    return solutions
@@ -0,0 +1,281 @@
+"""Time every DayNN solution and compare against a stored baseline
+
+    python -m src.bench --repeat 5 --output bench.json
+    python -m src.bench --baseline bench.json --tolerance 0.25 --min-delta 0.005
+"""
+from __future__ import annotations
+
+import argparse
+from contextlib import redirect_stdout
+import io
+import json
+import os
+import platform
+from statistics import median
+import sys
+from time import get_clock_info, perf_counter
+import tracemalloc
+from typing import Any, Callable, Optional
+
+from src.base import Solution, discover_solutions
+
+STAGES = ("parse", "part_one", "part_two")
+
+# Stages faster than the timer can measure are never compared
+TIMER_RESOLUTION = get_clock_info("perf_counter").resolution
+
+
+def _run_stages(solution: Solution) -> dict[str, tuple[float, Any]]:
+    """Load the input and run both parts, returning the elapsed
+    time and result of each stage
+    """
+    timings: dict[str, tuple[float, Any]] = {}
+
+    start = perf_counter()
+    parsed = solution.load()
+    timings["parse"] = (perf_counter() - start, None)
+
+    for stage in STAGES[1:]:
+        part: Callable = getattr(solution, stage)
+        start = perf_counter()
+        answer = part(parsed)
+        timings[stage] = (perf_counter() - start, answer)
+
+    return timings
+
+
+def _peak_memory(solution: Solution) -> dict[str, int]:
+    """Peak bytes allocated by each stage, measured separately
+    from the timing runs as tracing slows everything down
+    """
+    peaks: dict[str, int] = {}
+
+    tracemalloc.start()
+    try:
+        parsed = solution.load()
+        peaks["parse"] = tracemalloc.get_traced_memory()[1]
+
+        for stage in STAGES[1:]:
+            tracemalloc.reset_peak()
+            getattr(solution, stage)(parsed)
+            peaks[stage] = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return peaks
+
+
+def bench_day(
+    solution_cls: type[Solution],
+    input_path: str,
+    warmup: int = 1,
+    repeat: int = 5,
+    memory: bool = True,
+) -> dict[str, Any]:
+    """Benchmark parse and both parts of a single day. A fresh
+    solution is created for every run so the parse cache is cold.
+    """
+    seconds: dict[str, list[float]] = {stage: [] for stage in STAGES}
+    answers: dict[str, Any] = {}
+
+    # Silence solutions that print (e.g. the Day10 screen)
+    with redirect_stdout(io.StringIO()):
+        for i in range(warmup + repeat):
+            timings = _run_stages(solution_cls(input_path=input_path))
+            if i < warmup:
+                continue
+
+            for stage, (elapsed, answer) in timings.items():
+                seconds[stage].append(elapsed)
+                answers[stage] = answer
+
+        peaks = _peak_memory(solution_cls(input_path=input_path)) if memory else {}
+
+    report: dict[str, Any] = {"input": input_path}
+    for stage in STAGES:
+        report[stage] = {
+            "min_s": min(seconds[stage]),
+            "median_s": median(seconds[stage]),
+            "peak_bytes": peaks.get(stage),
+        }
+        if stage != "parse":
+            report[stage]["answer"] = repr(answers[stage])
+
+    return report
+
+
+def run(
+    days: Optional[list[str]] = None,
+    inputs: Optional[dict[str, str]] = None,
+    warmup: int = 1,
+    repeat: int = 5,
+    memory: bool = True,
+) -> dict[str, Any]:
+    inputs = inputs or {}
+    results: dict[str, Any] = {}
+
+    for day, solution_cls in discover_solutions().items():
+        if days and day not in days:
+            continue
+
+        input_path = inputs.get(day) or solution_cls().path
+        if not os.path.exists(input_path):
+            results[day] = {"input": input_path, "skipped": "missing input"}
+            continue
+
+        try:
+            results[day] = bench_day(
+                solution_cls, input_path, warmup=warmup, repeat=repeat, memory=memory
+            )
+        except Exception as err:
+            results[day] = {"input": input_path, "error": repr(err)}
+
+    return {
+        "python": platform.python_version(),
+        "warmup": warmup,
+        "repeat": repeat,
+        "days": results,
+    }
+
+
+def find_regressions(
+    current: dict[str, Any],
+    baseline: dict[str, Any],
+    tolerance: float,
+    min_delta: float = 0.001,
+) -> list[str]:
+    """Compare stage times and answers against a baseline report,
+    returning a description of each regression found. The fastest
+    run of each stage is compared, as it's the least noisy, and a
+    stage only counts as slower if it's both `tolerance` slower and
+    at least `min_delta` seconds slower.
+    """
+    regressions: list[str] = []
+
+    for day, base_report in baseline["days"].items():
+        report = current["days"].get(day)
+        if report is None:
+            # Day wasn't selected for this run
+            continue
+
+        if "error" in report or "skipped" in report:
+            if "error" not in base_report and "skipped" not in base_report:
+                regressions.append(f"day {day}: failed but passed in baseline")
+            continue
+
+        for stage in STAGES:
+            if stage not in base_report:
+                continue
+
+            was = base_report[stage]["min_s"]
+            now = report[stage]["min_s"]
+            if (
+                was > TIMER_RESOLUTION
+                and now > was * (1 + tolerance)
+                and now - was >= min_delta
+            ):
+                regressions.append(
+                    f"day {day} {stage}: {now:.6f}s vs baseline {was:.6f}s"
+                )
+
+            if report[stage].get("answer") != base_report[stage].get("answer"):
+                regressions.append(
+                    f"day {day} {stage}: answer {report[stage].get('answer')} "
+                    f"vs baseline {base_report[stage].get('answer')}"
+                )
+
+    return regressions
+
+
+def format_report(report: dict[str, Any]) -> str:
+    lines = [
+        f"{'day':<4}{'stage':<10}{'median (s)':>14}{'min (s)':>14}{'peak (KiB)':>14}"
+    ]
+    for day, day_report in report["days"].items():
+        if "skipped" in day_report or "error" in day_report:
+            reason = day_report.get("skipped") or day_report.get("error")
+            lines.append(f"{day:<4}{reason}")
+            continue
+
+        for stage in STAGES:
+            stats = day_report[stage]
+            peak = stats["peak_bytes"]
+            peak_kib = f"{peak / 1024:.1f}" if peak is not None else "-"
+            lines.append(
+                f"{day:<4}{stage:<10}{stats['median_s']:>14.6f}"
+                f"{stats['min_s']:>14.6f}{peak_kib:>14}"
+            )
+
+    return "\n".join(lines)
+
+
+def _parse_input_override(value: str) -> tuple[str, str]:
+    day, sep, path = value.partition("=")
+    if not sep:
+        raise argparse.ArgumentTypeError(f"expected DAY=PATH, got {value!r}")
+    return day.zfill(2), path
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.bench", description=__doc__)
+    parser.add_argument("--days", nargs="+", help="two digit days to run, e.g. 07 12")
+    parser.add_argument(
+        "--input",
+        action="append",
+        type=_parse_input_override,
+        default=[],
+        metavar="DAY=PATH",
+        help="input file to use for a day instead of inputs/<day>.txt",
+    )
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--no-memory", action="store_true", help="skip peak memory measurement"
+    )
+    parser.add_argument("--output", help="write the JSON report to this path")
+    parser.add_argument("--baseline", help="JSON report to compare against")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="allowed fractional slowdown over the baseline (default 0.2)",
+    )
+    parser.add_argument(
+        "--min-delta",
+        type=float,
+        default=0.001,
+        help="seconds a stage must slow down by to be a regression (default 0.001)",
+    )
+    args = parser.parse_args(argv)
+
+    report = run(
+        days=[day.zfill(2) for day in args.days] if args.days else None,
+        inputs=dict(args.input),
+        warmup=args.warmup,
+        repeat=args.repeat,
+        memory=not args.no_memory,
+    )
+    print(format_report(report))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+        regressions = find_regressions(
+            report, baseline, args.tolerance, min_delta=args.min_delta
+        )
+        if regressions:
+            print("\nREGRESSIONS:", file=sys.stderr)
+            for regression in regressions:
+                print(f"  {regression}", file=sys.stderr)
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,8 @@
-from collections import deque
-from dataclasses import dataclass
+from __future__ import annotations
+
+from dataclasses import dataclass, field
 from string import ascii_uppercase
+from typing import Iterable, Iterator
 
 from src.base import Solution
 
@@ -12,97 +14,210 @@ class Action:
     future: int
 
 
-class Day05(Solution):
-    name = "05"
-    stacks: list[deque]
-
-    def part_one(self, crane_instructions: list[str]) -> str:
-        # Interpret instructions
-        self.stacks = self.create_stacks(crane_instructions)
-        actions = self.parse_instructions(crane_instructions)
+# Largest run of crates kept in a single chunk
+CHUNK_SIZE = 1024
 
-        # Rearrange crates
-        for action in actions:
-            for _ in range(action.n):
-                crate = self.stacks[action.current - 1].pop()
-                self.stacks[action.future - 1].append(crate)
 
-        # Determine top crate of each stack
-        top_crates = ""
-        for i in range(len(self.stacks)):
-            top_crates += self.stacks[i].pop()
+@dataclass
+class Chunk:
+    """Run of crates moved as a unit. Flipping `reversed` turns the
+    run upside down without touching the crates themselves.
+    """
 
-        return top_crates
+    # Bottom to top, unless reversed
+    crates: list[str]
+    reversed: bool = False
 
-    def part_two(self, crane_instructions: list[str]) -> str:
-        # Interpret instructions
-        self.stacks = self.create_stacks(crane_instructions)
-        actions = self.parse_instructions(crane_instructions)
+    def __len__(self) -> int:
+        return len(self.crates)
 
-        # Rearrange crates, keeping multi-crate moves in order
-        for action in actions:
-            temp_crates: list[str] = []
-            for _ in range(action.n):
-                crate = self.stacks[action.current - 1].pop()
-                temp_crates.append(crate)
+    @property
+    def top(self) -> str:
+        return self.crates[0] if self.reversed else self.crates[-1]
 
-            for crate in temp_crates[::-1]:
-                self.stacks[action.future - 1].append(crate)
+    def bottom_to_top(self) -> list[str]:
+        return self.crates[::-1] if self.reversed else self.crates
 
-        # Determine top crate of each stack
-        top_crates = ""
-        for i in range(len(self.stacks)):
-            top_crates += self.stacks[i].pop()
+    def split_top(self, n: int) -> Chunk:
+        """Remove the top `n` crates into a new chunk"""
+        if self.reversed:
+            top = Chunk(crates=self.crates[:n], reversed=True)
+            del self.crates[:n]
+        else:
+            top = Chunk(crates=self.crates[-n:])
+            del self.crates[-n:]
+        return top
 
-        return top_crates
 
-    def create_stacks(self, crane_instructions: list[str]) -> list[deque]:
-        """Generate a list of filled stacks from the original input"""
+@dataclass
+class CrateStack:
+    """Stack of crates held as a list of chunks, bottom to top, so
+    moving many crates relinks whole chunks and splits at most one
+    rather than handling every crate
+    """
+
+    chunks: list[Chunk] = field(default_factory=list)
+    size: int = 0
+
+    @classmethod
+    def from_crates(cls, crates: Iterable[str]) -> CrateStack:
+        """Build a stack from crates listed bottom to top"""
+        crates = list(crates)
+        return CrateStack(
+            chunks=[
+                Chunk(crates=crates[i : i + CHUNK_SIZE])
+                for i in range(0, len(crates), CHUNK_SIZE)
+            ],
+            size=len(crates),
+        )
+
+    @property
+    def top(self) -> str:
+        return self.chunks[-1].top if self.chunks else ""
+
+    def crates(self) -> list[str]:
+        return [crate for chunk in self.chunks for crate in chunk.bottom_to_top()]
+
+    def take(self, n: int) -> list[Chunk]:
+        """Remove the top `n` crates, returned as chunks bottom to top"""
+        if n > self.size:
+            raise ValueError(f"Can't take {n} crates from a stack of {self.size}")
+
+        self.size -= n
+        taken: list[Chunk] = []
+        while n:
+            if len(self.chunks[-1]) <= n:
+                taken.append(self.chunks.pop())
+                n -= len(taken[-1])
+            else:
+                taken.append(self.chunks[-1].split_top(n))
+                n = 0
+
+        taken.reverse()
+        return taken
+
+    def put(self, chunks: list[Chunk]):
+        """Place chunks (bottom to top) on top of the stack"""
+        if not chunks:
+            return
+
+        boundary = len(self.chunks)
+        self.chunks.extend(chunks)
+        self.size += sum(len(chunk) for chunk in chunks)
+
+        # Stop repeated small moves from fragmenting the stack
+        if boundary and len(self.chunks[boundary - 1]) + len(chunks[0]) <= CHUNK_SIZE:
+            below, above = self.chunks[boundary - 1], self.chunks.pop(boundary)
+            self.chunks[boundary - 1] = Chunk(
+                crates=below.bottom_to_top() + above.bottom_to_top()
+            )
 
-        # Find number of stacks needed
-        for line in crane_instructions:
-            if line.lstrip()[0] == "[":
-                continue
 
-            n_stacks = len(line.split())
+def move_crates(
+    stacks: list[CrateStack], action: Action, keep_order: bool = False
+):
+    """Move `action.n` crates in one go. The CrateMover 9000 lifts
+    one crate at a time, leaving them upside down, while the 9001
+    keeps them in order.
+    """
+    chunks = stacks[action.current - 1].take(action.n)
+    if not keep_order:
+        chunks.reverse()
+        for chunk in chunks:
+            chunk.reversed = not chunk.reversed
+
+    stacks[action.future - 1].put(chunks)
+
+
+def read_drawing(lines: Iterator[str]) -> list[list[str]]:
+    """Consume the drawing of the starting stacks from `lines`, up to
+    and including the blank line after it, returning each stack's
+    crates bottom to top
+    """
+    rows: list[str] = []
+    for line in lines:
+        if not line.strip():
             break
+        rows.append(line.rstrip("\n"))
 
-        # Fill stacks will input crates
-        stacks: list[deque] = [deque() for _ in range(n_stacks)]
-        stacks_filled = False
-        for line in crane_instructions:
-            if stacks_filled:
-                break
-
-            for stack in range(n_stacks):
-                crate = line[stack * 4 + 1]
-                if crate in ascii_uppercase:
-                    stacks[stack].appendleft(crate)
-
-                if crate == "1":
-                    # We've hit the stack numbering; no more
-                    # crates left to process
-                    stacks_filled = True
-                    break
-
-        return stacks
-
-    def parse_instructions(self, crane_instructions: list[str]) -> list[Action]:
-        actions: list[Action] = []
-        for line in crane_instructions:
-            if line[:4] != "move":
-                # Skip crate description overview
-                continue
-
-            parsed = line.split()
-            actions.append(
-                Action(
-                    n=int(parsed[1].strip()),
-                    current=int(parsed[3].strip()),
-                    future=int(parsed[5].strip()),
-                )
-            )
-        return actions
+    # Last row of the drawing numbers the stacks
+    n_stacks = len(rows.pop().split())
+    stacks: list[list[str]] = [[] for _ in range(n_stacks)]
+    for row in reversed(rows):
+        for stack in range(n_stacks):
+            col = stack * 4 + 1
+            if col < len(row) and row[col] in ascii_uppercase:
+                stacks[stack].append(row[col])
+
+    return stacks
+
+
+def parse_moves(lines: Iterable[str]) -> Iterator[Action]:
+    """Lazily turn each `move n from a to b` line into an Action"""
+    for line in lines:
+        if line[:4] != "move":
+            continue
+
+        parsed = line.split()
+        yield Action(
+            n=int(parsed[1]),
+            current=int(parsed[3]),
+            future=int(parsed[5]),
+        )
+
+
+@dataclass
+class Procedure:
+    """Starting stacks, bottom to top, and the moves to apply"""
+
+    drawing: list[list[str]]
+    moves: Iterable[Action]
+
+
+@dataclass
+class StreamedMoves:
+    """Moves read afresh from the input file on every iteration, so
+    each crane gets its own streaming pass and no move is held in
+    memory
+    """
+
+    solution: Solution
+
+    def __iter__(self) -> Iterator[Action]:
+        lines = self.solution.read_lines()
+        read_drawing(lines)
+        yield from parse_moves(lines)
+
+
+def rearrange(procedure: Procedure, keep_order: bool) -> str:
+    """Apply every move to a fresh copy of the starting stacks,
+    returning the crates left on top
+    """
+    stacks = [CrateStack.from_crates(stack) for stack in procedure.drawing]
+    for action in procedure.moves:
+        move_crates(stacks, action, keep_order=keep_order)
+    return "".join(stack.top for stack in stacks)
+
+
+class Day05(Solution):
+    name = "05"
+
+    def parse(self, crane_instructions: Iterable[str]) -> Procedure:
+        lines = iter(crane_instructions)
+        drawing = read_drawing(lines)
+
+        if self.stream:
+            # Each part re-reads the moves rather than sharing a list
+            lines.close()
+            return Procedure(drawing=drawing, moves=StreamedMoves(self))
+
+        return Procedure(drawing=drawing, moves=list(parse_moves(lines)))
+
+    def part_one(self, procedure: Procedure) -> str:
+        return rearrange(procedure, keep_order=False)
+
+    def part_two(self, procedure: Procedure) -> str:
+        return rearrange(procedure, keep_order=True)
 
 
 if __name__ == '__main__':
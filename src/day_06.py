@@ -1,45 +1,134 @@
-from collections import deque
+from dataclasses import dataclass, field
+from typing import Hashable, Iterable, Iterator
 
 from src.base import Solution
 
 
+@dataclass
+class MarkerScanner:
+    """Finds, for every window size, the number of characters read
+    once the most recent window of that size is all distinct.
+
+    Remembering where each character was last seen gives the start
+    of the longest all-distinct run ending at the current position.
+    That run's length only grows one step at a time, so each window
+    size is satisfied the first time the run reaches it. The signal
+    can be fed in chunks; positions are absolute, so windows carry
+    over chunk boundaries.
+    """
+
+    window_sizes: Iterable[int]
+    found: dict[int, int] = field(default_factory=dict)
+    consumed: int = 0
+    run_start: int = 0
+    last_seen: dict[Hashable, int] = field(default_factory=dict)
+
+    def __post_init__(self):
+        self.pending = sorted(set(self.window_sizes))
+
+    @property
+    def done(self) -> bool:
+        return not self.pending
+
+    def feed(self, chunk: Iterable[Hashable]) -> bool:
+        """Scan the next part of the signal, returning True once
+        every marker has been found
+        """
+        pending = self.pending
+        last_seen = self.last_seen
+        run_start = self.run_start
+
+        idx = self.consumed - 1
+        for idx, char in enumerate(chunk, self.consumed):
+            if last_seen.get(char, -1) >= run_start:
+                run_start = last_seen[char] + 1
+            last_seen[char] = idx
+
+            while pending and idx - run_start + 1 >= pending[0]:
+                self.found[pending.pop(0)] = idx + 1
+
+            if not pending:
+                break
+
+        self.consumed = idx + 1
+        self.run_start = run_start
+        return self.done
+
+    @property
+    def markers(self) -> dict[int, int]:
+        """Marker position for every window size, -1 if not found"""
+        return {**self.found, **{size: -1 for size in self.pending}}
+
+
+def find_markers(
+    signal: Iterable[Hashable], window_sizes: Iterable[int]
+) -> dict[int, int]:
+    """Position of the marker for each window size in a single pass
+    over `signal`, -1 where there isn't one
+    """
+    scanner = MarkerScanner(window_sizes)
+    scanner.feed(signal)
+    return scanner.markers
+
+
+def scan_chunks(
+    chunks: Iterable[bytes], window_sizes: Iterable[int]
+) -> dict[int, int]:
+    """Like `find_markers`, but fed one chunk at a time and stops
+    pulling chunks as soon as every marker is found
+    """
+    scanner = MarkerScanner(window_sizes)
+    for chunk in chunks:
+        if scanner.feed(chunk):
+            break
+    return scanner.markers
+
+
+@dataclass
 class Day06(Solution):
     name = "06"
-
-    def read(self) -> str:
-        with open(f"inputs/{self.name}.txt", encoding="utf-8") as f:
-            puzzle_input = f.readline().strip()
-        return puzzle_input
-
-    def part_one(self, signal: str) -> int:
-        marker_check: deque[str] = deque()
-
-        for i in range(3):
-            marker_check.append(signal[i])
-
-        for i in range(3, len(signal)):
-            marker_check.append(signal[i])
-            if len(set(marker_check)) == 4:
-                return i + 1
-
-            marker_check.popleft()
-
-        return -1
-
-    def part_two(self, signal: str) -> int:
-        marker_check: deque[str] = deque()
-
-        for i in range(13):
-            marker_check.append(signal[i])
-
-        for i in range(13, len(signal)):
-            marker_check.append(signal[i])
-            if len(set(marker_check)) == 14:
-                return i + 1
-
-            marker_check.popleft()
-
-        return -1
+    # Bytes of the signal read from disk at a time
+    chunk_size: int = 64 * 1024
+
+    def read(self) -> Iterator[bytes]:
+        """Lazily read the signal, the first line of the input with
+        surrounding whitespace stripped, in binary chunks rather than
+        loading it into a single string. Whitespace at the end of a
+        chunk (e.g. the `\r` of a `\r\n` split across two chunks) is
+        held back until it's clear whether more signal follows.
+        """
+        # Whitespace read but not yet known to be inside the signal
+        held = b""
+        started = False
+
+        with open(self.path, "rb") as f:
+            while chunk := f.read(self.chunk_size):
+                end = chunk.find(b"\n")
+                if end != -1:
+                    chunk = chunk[:end]
+
+                if not started:
+                    chunk = chunk.lstrip()
+                    started = bool(chunk)
+
+                body = chunk.rstrip()
+                if body:
+                    yield held + body if held else body
+                    held = chunk[len(body) :]
+                else:
+                    held += chunk
+
+                if end != -1:
+                    return
+
+    def parse(self, chunks: Iterable[bytes]) -> dict[int, int]:
+        return scan_chunks(chunks, window_sizes=(4, 14))
+
+    def part_one(self, markers: dict[int, int]) -> int:
+        return markers[4]
+
+    def part_two(self, markers: dict[int, int]) -> int:
+        return markers[14]
 
 
 if __name__ == '__main__':
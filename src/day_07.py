@@ -1,135 +1,324 @@
 from __future__ import annotations
 
-from collections import defaultdict
+from bisect import bisect_left, bisect_right, insort
 from dataclasses import dataclass, field
-import hashlib
-import re
-from typing import Optional
+from typing import Iterable, Optional
 
 from src.base import Solution
 
 
-@dataclass
+@dataclass(eq=False)
 class Node:
+    """Nodes hash and compare by identity; two entries with the
+    same name in different directories are different nodes
+    """
+
+    node_id: int
     name: str
     is_dir: bool
     parent: Optional[Node]
     size: int = 0
+    children: dict[str, Node] = field(default_factory=dict)
+
+    @property
+    def path(self) -> str:
+        names: list[str] = []
+        node: Optional[Node] = self
+        while node is not None and node.parent is not None:
+            names.append(node.name)
+            node = node.parent
+        return "/" + "/".join(reversed(names))
 
-    def __hash__(self):
-        s = f"{self.name}-none"
-        if self.parent:
-            s = f"{self.name}-{self.parent.name}"
-        return int(hashlib.sha256(bytearray(s, encoding="utf-8")).hexdigest(), 16)
+
+# Sorted totals are split into buckets of around this many, so an
+# update only shifts the items of one small bucket
+BUCKET_SIZE = 256
+
+
+@dataclass
+class DirectorySizeIndex:
+    """Total size of every directory, kept up to date as files
+    change by pushing each change up through the ancestors. The
+    totals are also held in sorted buckets, each with its largest
+    total and its sum, and a Fenwick tree over the bucket sums.
+    Threshold queries binary search the buckets, then take a prefix
+    sum from the tree plus part of one bucket, so they're logarithmic
+    in the number of buckets. Updates only shift the bucket they land
+    in; the tree is rebuilt only when buckets split or empty out.
+    """
+
+    # Total size keyed by directory node_id
+    totals: dict[int, int] = field(default_factory=dict)
+    buckets: list[list[int]] = field(default_factory=list)
+    bucket_maxes: list[int] = field(default_factory=list)
+    bucket_sums: list[int] = field(default_factory=list)
+    # 1-based Fenwick tree over `bucket_sums`
+    _tree: list[int] = field(default_factory=lambda: [0], repr=False)
+
+    def __post_init__(self):
+        self._rebuild_tree()
+
+    @classmethod
+    def from_totals(cls, totals: dict[int, int]) -> DirectorySizeIndex:
+        """Index precomputed totals with a single sort"""
+        ordered = sorted(totals.values())
+        buckets = [
+            ordered[i : i + BUCKET_SIZE] for i in range(0, len(ordered), BUCKET_SIZE)
+        ]
+        return DirectorySizeIndex(
+            totals=dict(totals),
+            buckets=buckets,
+            bucket_maxes=[bucket[-1] for bucket in buckets],
+            bucket_sums=[sum(bucket) for bucket in buckets],
+        )
+
+    def add_directory(self, directory: Node):
+        self.totals[directory.node_id] = 0
+        self._insert(0)
+
+    def total(self, directory: Node) -> int:
+        return self.totals[directory.node_id]
+
+    def apply_delta(self, directory: Optional[Node], delta: int):
+        """Add `delta` bytes to `directory` and all of its ancestors"""
+        if delta == 0:
+            return
+
+        while directory is not None:
+            old = self.totals[directory.node_id]
+            self._remove(old)
+            self._insert(old + delta)
+            self.totals[directory.node_id] = old + delta
+            directory = directory.parent
+
+    def sum_at_most(self, limit: int) -> int:
+        """Sum of the totals of every directory no larger than `limit`"""
+        idx = bisect_right(self.bucket_maxes, limit)
+        total = self._sum_of_buckets(idx)
+        if idx < len(self.buckets):
+            bucket = self.buckets[idx]
+            total += sum(bucket[: bisect_right(bucket, limit)])
+        return total
+
+    def smallest_at_least(self, minimum: int) -> Optional[int]:
+        """Total of the smallest directory at least `minimum` in size"""
+        idx = bisect_left(self.bucket_maxes, minimum)
+        if idx == len(self.buckets):
+            return None
+        bucket = self.buckets[idx]
+        return bucket[bisect_left(bucket, minimum)]
+
+    def _insert(self, value: int):
+        if not self.buckets:
+            self.buckets.append([value])
+            self.bucket_maxes.append(value)
+            self.bucket_sums.append(value)
+            self._rebuild_tree()
+            return
+
+        idx = min(bisect_left(self.bucket_maxes, value), len(self.buckets) - 1)
+        bucket = self.buckets[idx]
+        insort(bucket, value)
+        self.bucket_maxes[idx] = bucket[-1]
+
+        if len(bucket) > 2 * BUCKET_SIZE:
+            halves = [bucket[:BUCKET_SIZE], bucket[BUCKET_SIZE:]]
+            self.buckets[idx : idx + 1] = halves
+            self.bucket_maxes[idx : idx + 1] = [half[-1] for half in halves]
+            self.bucket_sums[idx : idx + 1] = [sum(half) for half in halves]
+            self._rebuild_tree()
+        else:
+            self._add_to_bucket(idx, value)
+
+    def _remove(self, value: int):
+        idx = bisect_left(self.bucket_maxes, value)
+        bucket = self.buckets[idx]
+        del bucket[bisect_left(bucket, value)]
+
+        if bucket:
+            self.bucket_maxes[idx] = bucket[-1]
+            self._add_to_bucket(idx, -value)
+        else:
+            del self.buckets[idx]
+            del self.bucket_maxes[idx]
+            del self.bucket_sums[idx]
+            self._rebuild_tree()
+
+    def _add_to_bucket(self, idx: int, delta: int):
+        self.bucket_sums[idx] += delta
+        tree = self._tree
+        i = idx + 1
+        while i < len(tree):
+            tree[i] += delta
+            i += i & -i
+
+    def _sum_of_buckets(self, count: int) -> int:
+        """Sum of the first `count` buckets"""
+        tree = self._tree
+        total = 0
+        while count:
+            total += tree[count]
+            count -= count & -count
+        return total
+
+    def _rebuild_tree(self):
+        """Build the tree from `bucket_sums` in linear time"""
+        tree = [0, *self.bucket_sums]
+        for i in range(1, len(tree)):
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self._tree = tree
 
 
 @dataclass
 class FileSystem:
     root: Node
-    nodes: dict[Node, list[Node]] = field(default_factory=dict)
+    # Every node, indexed by its node_id
+    nodes: list[Node] = field(default_factory=list)
+    # Directory totals, only kept up to date once built
+    index: Optional[DirectorySizeIndex] = None
 
     @classmethod
     def new(cls) -> FileSystem:
-        root = Node(name="/", is_dir=True, parent=None)
-        return FileSystem(root=root, nodes={root: []})
-
-
-def get_directory_sizes(
-    nodes: dict[Node, list[Node]],
-    start_node: Node,
-    visited: set[Node],
-) -> list[int]:
-    """Perform depth-first traversal of nodes, accumulating
-    the size underneath a node as it's traversed back on the
-    way up. Returns a list of total size for all nodes that
-    are a directory.
+        root = Node(node_id=0, name="/", is_dir=True, parent=None)
+        return FileSystem(root=root, nodes=[root])
+
+    def build_index(self) -> DirectorySizeIndex:
+        """Total every directory in one pass and index them, after
+        which every change is applied to the index as it happens
+        """
+        sizes = get_directory_sizes(self.nodes, self.root)
+        self.index = DirectorySizeIndex.from_totals(
+            {node.node_id: sizes[node.node_id] for node in self.nodes if node.is_dir}
+        )
+        return self.index
+
+    def _add_node(self, parent: Node, name: str, is_dir: bool, size: int = 0) -> Node:
+        node = Node(
+            node_id=len(self.nodes), name=name, is_dir=is_dir, parent=parent, size=size
+        )
+        parent.children[name] = node
+        self.nodes.append(node)
+        return node
+
+    def mkdir(self, parent: Node, name: str) -> Node:
+        if (existing := parent.children.get(name)) is not None:
+            # Listed before, e.g. by running `ls` twice
+            return existing
+
+        directory = self._add_node(parent, name, is_dir=True)
+        if self.index is not None:
+            self.index.add_directory(directory)
+        return directory
+
+    def touch(self, parent: Node, name: str, size: int) -> Node:
+        """Create a file, or resize it if it already exists"""
+        if (existing := parent.children.get(name)) is not None:
+            self.resize(existing, size)
+            return existing
+
+        file = self._add_node(parent, name, is_dir=False, size=size)
+        if self.index is not None:
+            self.index.apply_delta(parent, size)
+        return file
+
+    def resize(self, file: Node, size: int):
+        if self.index is not None:
+            self.index.apply_delta(file.parent, size - file.size)
+        file.size = size
+
+    def remove(self, file: Node):
+        if file.is_dir:
+            raise ValueError(f"Can only remove files, not {file.path}")
+
+        self.resize(file, 0)
+        del file.parent.children[file.name]
+
+    def resolve(self, path: str) -> Node:
+        """Find the node at an absolute path, e.g. `/a/e`"""
+        node = self.root
+        for name in path.strip("/").split("/"):
+            if name:
+                node = node.children[name]
+        return node
+
+
+def get_directory_sizes(nodes: list[Node], start_node: Node) -> list[int]:
+    """Total size underneath every node in `start_node`'s tree,
+    indexed by node_id (a file's total is its own size, nodes
+    outside the tree are 0). Children are summed in post-order
+    using an explicit stack, so arbitrarily deep trees are fine,
+    and the nodes themselves are left untouched.
     """
-    if start_node not in visited:
-        visited.add(start_node)
+    sizes = [0] * len(nodes)
+
+    # Each entry is a node and whether its children are already summed
+    stack: list[tuple[Node, bool]] = [(start_node, False)]
+    while stack:
+        node, children_done = stack.pop()
+        if not node.is_dir:
+            sizes[node.node_id] = node.size
 
-        for child_node in nodes[start_node]:
-            if child_node not in visited:
-                get_directory_sizes(nodes, child_node, visited)
+        elif children_done:
+            sizes[node.node_id] = sum(
+                sizes[child.node_id] for child in node.children.values()
+            )
 
-            child_node.parent.size += child_node.size
+        else:
+            stack.append((node, True))
+            stack.extend((child, False) for child in node.children.values())
 
-    return [node.size for node in nodes.keys() if node.is_dir]
+    return sizes
 
 
 class Day07(Solution):
     name = "07"
 
-    def part_one(self, display: list[str]) -> int:
-        fs = self.build_filesystem(display)
+    def parse(self, display: Iterable[str]) -> FileSystem:
+        return self.build_filesystem(display)
 
-        visited: set[Node] = set()
-        sizes = get_directory_sizes(
-            nodes=fs.nodes,
-            start_node=fs.root,
-            visited=visited,
-        )
-        return sum(size for size in sizes if size <= 100_000)
+    def part_one(self, fs: FileSystem) -> int:
+        return fs.index.sum_at_most(100_000)
 
-    def part_two(self, display: list[str]) -> int:
+    def part_two(self, fs: FileSystem) -> int:
         total_disk_size = 70_000_000
         space_for_update = 30_000_000
 
-        fs = self.build_filesystem(display)
-        visited: set[Node] = set()
-        sizes = get_directory_sizes(
-            nodes=fs.nodes,
-            start_node=fs.root,
-            visited=visited,
-        )
-
-        current_usage = total_disk_size - max(sizes)
+        current_usage = total_disk_size - fs.index.total(fs.root)
         needed_space = space_for_update - current_usage
 
-        return min([size for size in sizes if size >= needed_space])
+        return fs.index.smallest_at_least(needed_space)
 
-    def build_filesystem(self, display: list[str]) -> FileSystem:
+    def build_filesystem(self, display: Iterable[str]) -> FileSystem:
         fs = FileSystem.new()
         curr_node: Node = fs.root
 
-        change_dir_in = re.compile("\$ cd [a-z]+")
-        change_dir_out = re.compile("\$ cd \.\.")
-        change_dir_root = re.compile("\$ cd /")
-        directory = re.compile("dir [a-z]+")
-        file = re.compile("[0-9]+ [a-z]+")
-
-        for entry in display[2:]:
-            entry = entry.strip()
-
-            if change_dir_in.match(entry):
-                to_dir = entry.split()[-1]
-                for child in fs.nodes[curr_node]:
-                    if child.name != to_dir:
-                        continue
-                    curr_node = child
-
-            elif change_dir_out.match(entry):
-                curr_node = curr_node.parent
-
-            elif change_dir_root.match(entry):
-                curr_node = fs.root
-
-            elif directory.match(entry):
-                name = entry.split()[1]
-                new_node = Node(name=name, is_dir=True, parent=curr_node)
-                fs.nodes[new_node] = []
-                fs.nodes[curr_node].append(new_node)
-
-            elif file.match(entry):
-                size, name = entry.split()[:2]
-                new_node = Node(
-                    name=name, is_dir=False, parent=curr_node, size=int(size)
-                )
-                fs.nodes[new_node] = []
-                fs.nodes[curr_node].append(new_node)
+        for entry in display:
+            entry = entry.rstrip()
+
+            if entry.startswith("$ cd "):
+                to_dir = entry[5:]
+                if to_dir == "/":
+                    curr_node = fs.root
+                elif to_dir == "..":
+                    curr_node = curr_node.parent
+                else:
+                    curr_node = fs.mkdir(curr_node, to_dir)
+
+            elif entry.startswith("dir "):
+                fs.mkdir(curr_node, entry[4:])
+
+            elif entry[:1].isdigit():
+                size, _, name = entry.partition(" ")
+                fs.touch(curr_node, name, int(size))
 
             elif entry != "$ ls":
                 raise ValueError(f"Failed to parse {entry=}")
 
+        # Totalling everything once at the end is linear, unlike
+        # pushing each file's size up through its ancestors
+        fs.build_index()
         return fs
 
 
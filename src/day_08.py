@@ -1,93 +1,124 @@
+import heapq
+
 from src.base import Solution
 
 
 class Day08(Solution):
     name = "08"
 
-    def part_one(self, heights_orig: list[str]) -> int:
-        heights, heights_transpose = create_matrices(heights_orig)
-
-        # Measure visibility for interior trees
-        visible_trees = 0
-        for row in range(1, len(heights) - 1):
-            for col in range(1, len(heights[row]) - 1):
-                if tree_visible(col, heights[row]) or tree_visible(
-                    row, heights_transpose[col]
-                ):
-                    visible_trees += 1
-
-        # Add trees visible from the grid edges, don't double count corners!
-        visible_trees += 2 * len(heights[0])
-        visible_trees += (2 * len(heights_transpose[0])) - 4
+    def parse(self, heights_orig: list[str]) -> list[list[int]]:
+        return create_matrix(heights_orig)
 
-        return visible_trees
+    def part_one(self, heights: list[list[int]]) -> int:
+        return sum(sum(row) for row in visibility_mask(heights))
 
-    def part_two(self, heights_orig: list[str]) -> int:
-        heights, heights_transpose = create_matrices(heights_orig)
+    def part_two(self, heights: list[list[int]]) -> int:
+        return max(max(row) for row in scenic_scores(heights))
 
-        best_scenic_score = 0
-        for row in range(len(heights)):
-            for col in range(len(heights[row])):
-                score_orig = scenic_score(col, heights[row])
-                score_transpose = scenic_score(row, heights_transpose[col])
 
-                if (score := score_orig * score_transpose) > best_scenic_score:
-                    best_scenic_score = score
+def create_matrix(heights_orig: list[str]) -> list[list[int]]:
+    """Convert input to a 2-d list of tree heights"""
+    return [[int(num) for num in line.strip()] for line in heights_orig if line.strip()]
 
-        return best_scenic_score
 
+def visibility_mask(heights: list[list[int]]) -> list[bytearray]:
+    """Mark every tree visible from outside the grid with a 1.
 
-def create_matrices(
-    heights_orig: list[str],
-) -> tuple[list[list[int]], list[list[int]]]:
-    """Build 2-d matrices for both the input and transpose
-    of the input
+    A tree is visible if it's taller than the running maximum of
+    the trees before it from any of the four directions. Rows are
+    scanned both ways, while columns keep one running maximum per
+    column as the rows are walked top to bottom and back again, so
+    the whole grid is covered in O(N^2) with no transposed copy.
     """
-    # Convert input to 2-d list
-    heights: list[list[int]] = []
-    for line in heights_orig:
-        line = line.strip()
-
-        row: list[int] = []
-        for num in line:
-            row.append(int(num))
-        heights.append(row)
-
-    # Transpose input; gross - wherefore art thou numpy?
-    heights_transpose: list[list[int]] = list(map(list, zip(*heights)))
-
-    return heights, heights_transpose
-
-
-def tree_visible(tree_idx: int, row_heights: list[int]) -> bool:
-    """Determine if a tree can be seen from within a
-    single row of neighbors. `tree_idx` must be an index
-    within the list of `row_heights`
+    n_rows = len(heights)
+    n_cols = len(heights[0]) if heights else 0
+    mask = [bytearray(n_cols) for _ in range(n_rows)]
+
+    for row, visible in zip(heights, mask):
+        tallest = -1
+        for col in range(n_cols):
+            if row[col] > tallest:
+                tallest = row[col]
+                visible[col] = 1
+
+        tallest = -1
+        for col in range(n_cols - 1, -1, -1):
+            if row[col] > tallest:
+                tallest = row[col]
+                visible[col] = 1
+
+    for row_order in (range(n_rows), range(n_rows - 1, -1, -1)):
+        tallest_in_col = [-1] * n_cols
+        for r in row_order:
+            row = heights[r]
+            visible = mask[r]
+            for col in range(n_cols):
+                if row[col] > tallest_in_col[col]:
+                    tallest_in_col[col] = row[col]
+                    visible[col] = 1
+
+    return mask
+
+
+def viewing_distances(row_heights: list[int]) -> tuple[list[int], list[int]]:
+    """Number of trees viewable from each tree looking towards the
+    start and towards the end of `row_heights`.
+
+    A stack holds the indices of trees not yet blocked by a later,
+    taller tree. Whatever remains on top after popping the shorter
+    ones is the first tree that blocks the view, so each tree is
+    pushed and popped at most once per direction.
     """
-    visible_from_left = row_heights[tree_idx] > max(row_heights[:tree_idx])
-    visible_from_right = row_heights[tree_idx] > max(row_heights[tree_idx + 1 :])
-    return visible_from_left or visible_from_right
-
-
-def scenic_score(tree_idx: int, row_heights: list[int]) -> int:
-    """Calculate score based on number of trees viewable
-    from `tree_idx`
+    n = len(row_heights)
+    towards_start = [0] * n
+    towards_end = [0] * n
+
+    stack: list[int] = []
+    for idx in range(n):
+        while stack and row_heights[stack[-1]] < row_heights[idx]:
+            stack.pop()
+        towards_start[idx] = idx - stack[-1] if stack else idx
+        stack.append(idx)
+
+    stack.clear()
+    for idx in range(n - 1, -1, -1):
+        while stack and row_heights[stack[-1]] < row_heights[idx]:
+            stack.pop()
+        towards_end[idx] = stack[-1] - idx if stack else n - 1 - idx
+        stack.append(idx)
+
+    return towards_start, towards_end
+
+
+def scenic_scores(heights: list[list[int]]) -> list[list[int]]:
+    """Scenic score of every tree, i.e. the product of its viewing
+    distances in all four directions
     """
-    score_right = 0
-    if tree_idx < len(row_heights):
-        for idx in range(tree_idx + 1, len(row_heights)):
-            score_right += 1
-            if not row_heights[tree_idx] > row_heights[idx]:
-                break
-
-    score_left = 0
-    if tree_idx > 0:
-        for idx in range(tree_idx - 1, -1, -1):
-            score_left += 1
-            if not row_heights[tree_idx] > row_heights[idx]:
-                break
-
-    return score_right * score_left
+    scores: list[list[int]] = []
+    for row in heights:
+        left, right = viewing_distances(row)
+        scores.append([l * r for l, r in zip(left, right)])
+
+    for col in range(len(heights[0]) if heights else 0):
+        up, down = viewing_distances([row[col] for row in heights])
+        for score_row, u, d in zip(scores, up, down):
+            score_row[col] *= u * d
+
+    return scores
+
+
+def top_scenic_locations(
+    scores: list[list[int]], k: int
+) -> list[tuple[int, int, int]]:
+    """The `k` highest scoring trees as (score, row, col)"""
+    return heapq.nlargest(
+        k,
+        (
+            (score, row, col)
+            for row, score_row in enumerate(scores)
+            for col, score in enumerate(score_row)
+        ),
+    )
 
 
 if __name__ == '__main__':
@@ -1,107 +1,87 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-import hashlib
+from typing import Iterable
 
 from src.base import Solution
-
-
-@dataclass
-class Location:
-    x: int
-    y: int
-
-    def __hash__(self) -> int:
-        s = f"{self.x}-{self.y}"
-        return int(hashlib.sha256(bytearray(s, encoding="utf-8")).hexdigest(), 16)
-
-    def _is_adjacent(self, other: Location) -> bool:
-        for x in [-1, 0, 1]:
-            for y in [-1, 0, 1]:
-                if (self.x == other.x + x) and (self.y == other.y + y):
-                    return True
-        return False
-
-    def _in_same_row_or_col(self, other: Location) -> bool:
-        return (self.x == other.x) ^ (self.y == other.y)
-
-    def _move_towards_other_along_row_or_col(self, other: Location):
-        if (x_diff := other.x - self.x) != 0:
-            self.x += 1 if x_diff > 0 else -1
-
-        else:
-            y_diff = other.y - self.y
-            self.y += 1 if y_diff > 0 else -1
-
-    def _move_towards_other_along_diagonal(self, other: Location):
-        x_diff = other.x - self.x
-        y_diff = other.y - self.y
-
-        self.x += 1 if x_diff > 0 else -1
-        self.y += 1 if y_diff > 0 else -1
-
-    def move_one(self, direction: str):
-        if direction == "U":
-            self.y += 1
-
-        elif direction == "D":
-            self.y -= 1
-
-        elif direction == "L":
-            self.x -= 1
-
-        elif direction == "R":
-            self.x += 1
-
-    def move_towards_other(self, other: Location):
-        if self._is_adjacent(other):
-            return
-
-        if self._in_same_row_or_col(other):
-            self._move_towards_other_along_row_or_col(other)
-
-        else:
-            self._move_towards_other_along_diagonal(other)
+from src.grid import SparseBitmap
+
+STEPS = {
+    "U": (0, 1),
+    "D": (0, -1),
+    "L": (-1, 0),
+    "R": (1, 0),
+}
+
+
+def parse_motions(motions: Iterable[str]) -> list[tuple[str, int]]:
+    parsed: list[tuple[str, int]] = []
+    for motion in motions:
+        if motion.strip():
+            direction, distance = motion.split()[:2]
+            parsed.append((direction, int(distance)))
+    return parsed
+
+
+def simulate_rope(
+    motions: Iterable[tuple[str, int]],
+    knots: int,
+    tracked: Iterable[int],
+) -> dict[int, SparseBitmap]:
+    """Move a rope of `knots` knots (the head being knot 0) through
+    every motion, returning the cells visited by each tracked knot.
+
+    Knot coordinates live in two flat lists. A knot only moves when
+    it's no longer touching the knot ahead, and then steps one cell
+    towards it along each axis that differs. Once a knot stays put,
+    none of the knots behind it can move either.
+    """
+    xs = [0] * knots
+    ys = [0] * knots
+    tracked = sorted(set(tracked))
+    visited: dict[int, SparseBitmap] = {knot: SparseBitmap() for knot in tracked}
+    for cells in visited.values():
+        cells.add(0, 0)
+
+    for direction, distance in motions:
+        step_x, step_y = STEPS[direction]
+
+        for _ in range(distance):
+            xs[0] += step_x
+            ys[0] += step_y
+
+            # Knots before this index moved on this step
+            moved = knots
+            for i in range(1, knots):
+                x_diff = xs[i - 1] - xs[i]
+                y_diff = ys[i - 1] - ys[i]
+                if -1 <= x_diff <= 1 and -1 <= y_diff <= 1:
+                    moved = i
+                    break
+
+                xs[i] += (x_diff > 0) - (x_diff < 0)
+                ys[i] += (y_diff > 0) - (y_diff < 0)
+
+            for knot in tracked:
+                if knot >= moved:
+                    break
+                visited[knot].add(xs[knot], ys[knot])
+
+    return visited
 
 
 class Day09(Solution):
     name = "09"
 
-    def part_one(self, motions: list[str]) -> int:
-        head = Location(x=0, y=0)
-        tail = Location(x=0, y=0)
-        visited: set[Location] = {tail}
-
-        for motion in motions:
-            direction, distance = motion.strip().split()[:2]
-
-            for _ in range(int(distance)):
-                head.move_one(direction)
-                tail.move_towards_other(head)
-                visited.add(tail)
-
-        return len(visited)
-
-    def part_two(self, motions: list[str]) -> int:
-        head = Location(x=0, y=0)
-        tails = [Location(x=0, y=0) for _ in range(9)]
-        visited: set[Location] = {tails[-1]}
-
-        for motion in motions:
-            direction, distance = motion.strip().split()[:2]
-
-            for _ in range(int(distance)):
-                head.move_one(direction)
-                tails[0].move_towards_other(head)
-
-                other = tails[0]
-                for tail in tails[1:]:
-                    tail.move_towards_other(other)
-                    other = tail
+    def parse(self, motions: list[str]) -> dict[int, SparseBitmap]:
+        # The tail of a 2 knot rope moves exactly like the second knot
+        # of a 10 knot one, so a single simulation covers both parts
+        return simulate_rope(parse_motions(motions), knots=10, tracked=(1, 9))
 
-                visited.add(tails[-1])
+    def part_one(self, visited: dict[int, SparseBitmap]) -> int:
+        return len(visited[1])
 
-        return len(visited)
+    def part_two(self, visited: dict[int, SparseBitmap]) -> int:
+        return len(visited[9])
 
 
 if __name__ == '__main__':
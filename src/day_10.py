@@ -1,81 +1,167 @@
+from array import array
 from dataclasses import dataclass, field
-import re
+from typing import Callable, Iterable, Iterator, Optional
 
 from src.base import Solution
 
+# Opcodes of the compiled program
+NOOP = 0
+ADDX = 1
+
 
 @dataclass
 class CPU:
-    clock: int = 0
     x_register: int = 1
-    compiled_instructions: list[str] = field(default_factory=list)
-    addx: re.Pattern = re.compile("addx -*[0-9]+")
-
-    def compile_instructions(self, instructions: list[str]):
-        """Read through and update the passed instructions
-        such that each entry can be accomplished in a single
-        clock cycle by adding noops for instructions previously
-        taking multiple cycles"""
-        for instruction in instructions:
-            instruction = instruction.rstrip()
+    # Flattened (opcode, operand) pairs
+    program: array = field(default_factory=lambda: array("q"))
 
-            if self.addx.match(instruction):
-                self.compiled_instructions.append("noop")
-                self.compiled_instructions.append(instruction)
+    def compile_instructions(self, instructions: Iterable[str]):
+        """Lower the text instructions into flat integer
+        (opcode, operand) pairs
+        """
+        for instruction in instructions:
+            instruction = instruction.strip()
+
+            if instruction.startswith("addx "):
+                self.program.extend((ADDX, int(instruction[5:])))
+
+            elif instruction == "noop":
+                self.program.extend((NOOP, 0))
+
+            elif instruction:
+                raise ValueError(f"Failed to parse {instruction=}")
+
+    def spans(self) -> Iterator[tuple[int, int, int]]:
+        """Yield (first cycle, last cycle, X) for each stretch of
+        cycles during which X holds steady. X only changes once an
+        `addx` completes, so the program is walked an instruction
+        at a time rather than a cycle at a time.
+        """
+        program = self.program
+        x = self.x_register
+        first = cycle = 1
+
+        for idx in range(0, len(program), 2):
+            if program[idx] == ADDX:
+                cycle += 2
+                yield first, cycle - 1, x
+                x += program[idx + 1]
+                first = cycle
 
             else:
-                self.compiled_instructions.append(instruction)
-
-    def make_empty_screen(self):
-        screen = []
-        for _ in range(6):
-            screen.append(["."] * 40)
-        return screen
-
-    def run_program(self, draw=False):
-        signal_strength: int = 0
-        screen: list[list[str]] = self.make_empty_screen()
-
-        for instruction in self.compiled_instructions:
-            self.clock += 1
-
-            if draw:
-                curr_pixel_col = (self.clock - 1) % 40
-                curr_pixel_row = self.clock // 40
+                cycle += 1
+
+        if cycle > first:
+            yield first, cycle - 1, x
+
+    def sample(
+        self,
+        schedule: Iterable[int],
+        callback: Optional[Callable[[int, int], None]] = None,
+    ) -> list[tuple[int, int]]:
+        """Read X during every cycle of an increasing `schedule`
+        (which may be endless, e.g. `itertools.count(20, 40)`),
+        returning (cycle, X) pairs and passing each to `callback`.
+        Costs time proportional to instructions plus samples, not
+        to the number of cycles run.
+        """
+        samples: list[tuple[int, int]] = []
+        schedule = iter(schedule)
+        target = next(schedule, None)
+
+        for first, last, x in self.spans():
+            while target is not None and target <= last:
+                if target >= first:
+                    samples.append((target, x))
+                    if callback is not None:
+                        callback(target, x)
+                target = next(schedule, None)
+
+            if target is None:
+                break
+
+        return samples
+
+    def signal_strength(self, schedule: Iterable[int]) -> int:
+        return sum(cycle * x for cycle, x in self.sample(schedule))
 
-                if abs(self.x_register - curr_pixel_col) < 2:
-                    screen[curr_pixel_row][curr_pixel_col] = "#"
 
-            if (self.clock == 20) or ((self.clock - 20) % 40 == 0):
-                if self.clock <= 220:
-                    strength = self.clock * self.x_register
-                    signal_strength += self.clock * self.x_register
-
-            if self.addx.match(instruction):
-                val_change = instruction.split()[-1]
-                self.x_register += int(val_change)
-
-        if draw:
-            for row in screen:
-                print("".join(row))
-
-        return signal_strength
+@dataclass
+class CRT:
+    """Screen drawn one pixel per cycle into a reusable byte buffer,
+    lit wherever the 3 pixel wide sprite centred on X overlaps the
+    pixel being drawn
+    """
+
+    width: int = 40
+    height: int = 6
+    lit: int = ord("#")
+    dark: int = ord(".")
+    frame: bytearray = field(init=False)
+
+    def __post_init__(self):
+        self.frame = bytearray([self.dark]) * (self.width * self.height)
+
+    def frames(self, cpu: CPU) -> Iterator[bytearray]:
+        """Yield the frame buffer each time a frame is completed,
+        plus any partly drawn final frame. The same buffer is reused
+        for every frame, so copy it (e.g. `bytes(frame)`) to keep it.
+        """
+        frame = self.frame
+        width = self.width
+        frame_size = len(frame)
+        dark_row = bytes([self.dark]) * width
+        sprite = bytes([self.lit]) * 3
+        pos = 0
+
+        for first, last, x in cpu.spans():
+            remaining = last - first + 1
+            while remaining:
+                # Draw up to the end of the current row in one go
+                col = pos % width
+                n = min(remaining, width - col)
+                frame[pos : pos + n] = dark_row[:n]
+
+                sprite_lo = max(x - 1, col)
+                sprite_hi = min(x + 1, col + n - 1)
+                if sprite_lo <= sprite_hi:
+                    row_start = pos - col
+                    frame[row_start + sprite_lo : row_start + sprite_hi + 1] = sprite[
+                        : sprite_hi - sprite_lo + 1
+                    ]
+
+                pos += n
+                remaining -= n
+                if pos == frame_size:
+                    yield frame
+                    pos = 0
+
+        if pos:
+            frame[pos:] = bytes([self.dark]) * (frame_size - pos)
+            yield frame
+
+    def render(self, frame: bytes) -> str:
+        return "\n".join(
+            frame[row : row + self.width].decode("ascii")
+            for row in range(0, len(frame), self.width)
+        )
 
 
 class Day10(Solution):
     name = "10"
 
-    def part_one(self, instructions: list[str]) -> int:
+    def parse(self, instructions: Iterable[str]) -> CPU:
         cpu = CPU()
         cpu.compile_instructions(instructions)
-        strength = cpu.run_program()
+        return cpu
 
-        return strength
+    def part_one(self, cpu: CPU) -> int:
+        return cpu.signal_strength(range(20, 221, 40))
 
-    def part_two(self, instructions: list[str]):
-        cpu = CPU()
-        cpu.compile_instructions(instructions)
-        cpu.run_program(draw=True)
+    def part_two(self, cpu: CPU) -> str:
+        crt = CRT()
+        first_frame = next(crt.frames(cpu), crt.frame)
+        return crt.render(first_frame)
 
 
 if __name__ == '__main__':
@@ -1,31 +1,31 @@
 from __future__ import annotations
 
+from collections import deque
 from dataclasses import dataclass, field
-import hashlib
 from typing import Union
 
 from src.base import Solution
+from src.grid import Coord
 
 Numeric = Union[float, int]
 
 
+Cell = Coord
+
+
 @dataclass
-class Cell:
-    x: int
-    y: int
+class FlatGrid:
+    """Row-major grid stored in a single flat list"""
+
+    width: int
+    height: int
+    cells: list[int] = field(default_factory=list)
 
-    def __hash__(self) -> int:
-        s = f"{self.x}-{self.y}"
-        return int(hashlib.sha256(bytearray(s, encoding="utf-8")).hexdigest(), 16)
+    def index(self, cell: Cell) -> int:
+        return cell.y * self.width + cell.x
 
-    @property
-    def neighbors(self) -> set[Cell]:
-        return {
-            Cell(self.x, self.y - 1),
-            Cell(self.x, self.y + 1),
-            Cell(self.x - 1, self.y),
-            Cell(self.x + 1, self.y),
-        }
+    def cell(self, idx: int) -> Cell:
+        return Cell(x=idx % self.width, y=idx // self.width)
 
 
 @dataclass
@@ -33,98 +33,119 @@ class HeightMap:
     location: Cell
     starts: list[Cell]
     end: Cell
-    elev: list[list[int]] = field(default_factory=list)
+    grid: FlatGrid
 
     @classmethod
     def new(cls, input: list[str], multi_start=False) -> HeightMap:
-        elev: list[list[int]] = []
+        rows = [line.rstrip() for line in input if line.strip()]
+        grid = FlatGrid(width=len(rows[0]), height=len(rows))
         starts: list[Cell] = []
-        end = Cell(x=-1, y=-1)
+        start = end = Cell(x=-1, y=-1)
 
-        for row_idx in range(len(input)):
-            elev_row: list[int] = []
-            for col_idx, char in enumerate(input[row_idx].rstrip()):
+        for row_idx, row in enumerate(rows):
+            for col_idx, char in enumerate(row):
                 value = ord(char)
                 if char == "S":
                     value = ord("a")
                     start = Cell(x=col_idx, y=row_idx)
-                    starts.append(start)
+                    starts.insert(0, start)
 
                 if char == "E":
                     value = ord("z")
-                    end.x = col_idx
-                    end.y = row_idx
+                    end = Cell(x=col_idx, y=row_idx)
 
                 if multi_start and char == "a":
-                    value = ord("a")
-                    start = Cell(x=col_idx, y=row_idx)
-                    starts.append(start)
+                    starts.append(Cell(x=col_idx, y=row_idx))
 
-                elev_row.append(value)
-            elev.append(elev_row)
+                grid.cells.append(value)
 
         return HeightMap(
             location=start,
             starts=starts,
             end=end,
-            elev=elev,
+            grid=grid,
         )
 
 
-def shortest_path(grid: list[list[int]], start: Cell, end: Cell) -> int:
-    unvisited_set: set[Cell] = set()
-    for y in range(len(grid)):
-        for x in range(len(grid[y])):
-            cell = Cell(x, y)
-            unvisited_set.add(cell)
+def _breadth_first_search(
+    grid: FlatGrid, sources: list[int], target: int
+) -> list[int]:
+    """Search outwards from every source at once, returning the
+    parent of each reached cell (sources point at themselves and
+    unreached cells hold -1). Every step costs 1, so the first time
+    a cell is reached is along a shortest path.
+    """
+    elev = grid.cells
+    width = grid.width
+    parent = [-1] * len(elev)
+
+    queue: deque[int] = deque()
+    for source in sources:
+        if parent[source] == -1:
+            parent[source] = source
+            queue.append(source)
+
+    while queue:
+        curr = queue.popleft()
+        if curr == target:
+            break
 
-    cost: list[list[Numeric]] = []
-    for i in range(len(grid)):
-        cost.append([float("inf") for _ in range(len(grid[i]))])
-    cost[start.y][start.x] = 0
+        x = curr % width
+        max_elev = elev[curr] + 1
+        for neighbor in (
+            curr - width,
+            curr + width,
+            curr - 1 if x > 0 else -1,
+            curr + 1 if x < width - 1 else -1,
+        ):
+            if (
+                0 <= neighbor < len(elev)
+                and parent[neighbor] == -1
+                and elev[neighbor] <= max_elev
+            ):
+                # Able to get there without climbing gear
+                parent[neighbor] = curr
+                queue.append(neighbor)
 
-    while unvisited_set:
-        lowest_cost = float("inf")
-        for cell in unvisited_set:
-            if cost[cell.y][cell.x] < lowest_cost:
-                curr = cell
-                lowest_cost = cost[cell.y][cell.x]
+    return parent
 
-        if lowest_cost == float("inf"):
-            # No more reachable cells remain
-            break
 
-        unvisited_set.remove(curr)
-        curr_elev = grid[curr.y][curr.x]
+def shortest_route(grid: FlatGrid, starts: list[Cell], end: Cell) -> list[Cell]:
+    """Cells along a shortest route from the nearest start to
+    `end`, inclusive of both. Empty if `end` can't be reached.
+    """
+    target = grid.index(end)
+    parent = _breadth_first_search(grid, [grid.index(s) for s in starts], target)
+    if parent[target] == -1:
+        return []
+
+    route = [target]
+    while parent[route[-1]] != route[-1]:
+        route.append(parent[route[-1]])
+
+    return [grid.cell(idx) for idx in reversed(route)]
 
-        unvisited_neighbors = curr.neighbors & unvisited_set
-        for neighbor in unvisited_neighbors:
-            neighbor_elev = grid[neighbor.y][neighbor.x]
-            if neighbor_elev - curr_elev < 2:
-                # Able to get there without climbing gear
-                cost[neighbor.y][neighbor.x] = min(
-                    cost[neighbor.y][neighbor.x], cost[curr.y][curr.x] + 1
-                )
 
-    return cost[end.y][end.x]
+def shortest_path(grid: FlatGrid, starts: list[Cell], end: Cell) -> Numeric:
+    """Number of steps from the nearest start to `end`, or
+    infinity if it can't be reached
+    """
+    route = shortest_route(grid, starts, end)
+    return len(route) - 1 if route else float("inf")
 
 
 class Day12(Solution):
     name = "12"
 
-    def part_one(self, input_map: list[str]) -> int:
-        heightmap = HeightMap.new(input_map)
-        dist = shortest_path(heightmap.elev, heightmap.starts[0], heightmap.end)
-        return dist
+    def parse(self, input_map: list[str]) -> HeightMap:
+        return HeightMap.new(input_map, multi_start=True)
 
-    def part_two(self, input_map: list[str]):
-        heightmap = HeightMap.new(input_map, multi_start=True)
-        shortest_dist = float("inf")
-        for start in heightmap.starts:
-            dist = shortest_path(heightmap.elev, start, heightmap.end)
-            shortest_dist = min(shortest_dist, dist)
+    def part_one(self, heightmap: HeightMap) -> Numeric:
+        return shortest_path(heightmap.grid, [heightmap.location], heightmap.end)
 
-        return shortest_dist
+    def part_two(self, heightmap: HeightMap) -> Numeric:
+        # Search from every lowest point at once rather than one at a time
+        return shortest_path(heightmap.grid, heightmap.starts, heightmap.end)
 
 
 if __name__ == '__main__':
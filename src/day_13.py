@@ -1,116 +1,213 @@
 from __future__ import annotations
 
-from ast import literal_eval
-from dataclasses import dataclass, field
-from src.base import Solution
-
-
-class Pass(Exception):
-    ...
-
-
-class Fail(Exception):
-    ...
-
+import re
+from typing import Iterable, Iterator, Optional, Union
 
-@dataclass
-class Packet:
-    value: list = field(default_factory=list)
+from src.base import Solution
 
-    def __eq__(self, other: Packet):
-        correct_forward = packets_are_correctly_ordered(self.value, other.value)
-        correct_backward = packets_are_correctly_ordered(other.value, self.value)
-        return correct_forward & correct_backward
 
-    def __lt__(self, other: Packet):
-        return packets_are_correctly_ordered(self.value, other.value)
+PacketData = Union[int, list]
+DIVIDER_PACKETS = ([[2]], [[6]])
 
 
 class Day13(Solution):
     name = "13"
 
-    def part_one(self, radio_packets: list[str]) -> int:
-        sum_of_correct_indicies: int = 0
+    def parse(self, radio_packets: Iterable[str]) -> list[list]:
+        return list(parse_packets(radio_packets))
 
-        for i, packet in enumerate(radio_packets):
-            if i % 3 == 0:
-                left_packet = Packet(value=literal_eval(packet.rstrip()))
-            elif i % 3 == 1:
-                right_packet = Packet(value=literal_eval(packet.rstrip()))
+    def part_one(self, packets: list[list]) -> int:
+        sum_of_correct_indicies: int = 0
 
-            else:
-                group_idx = (i // 3) + 1
-                if packets_are_correctly_ordered(
-                    left_packet.value,
-                    right_packet.value,
-                ):
-                    sum_of_correct_indicies += group_idx
+        for i in range(0, len(packets) - 1, 2):
+            group_idx = (i // 2) + 1
+            if packets_are_correctly_ordered(packets[i], packets[i + 1]):
+                sum_of_correct_indicies += group_idx
 
         return sum_of_correct_indicies
 
-    def part_two(self, radio_packets: list[str]) -> int:
-        packets: list[Packet] = []
-        for packet in radio_packets:
-            if packet == "\n":
-                continue
-
-            packets.append(Packet(value=literal_eval(packet.rstrip())))
-
-        packets.append(Packet(value=[[2]]))
-        packets.append(Packet(value=[[6]]))
-
-        packet_a: int = 0
-        packet_b: int = 0
-        for i, packet in enumerate(sorted(packets)):
-            if packet.value == [[[[2]]]]:
-                packet_a = i + 1
-
-            if packet.value == [[[[6]]]]:
-                packet_b = i + 1
-
-        return packet_a * packet_b
+    def part_two(self, packets: list[list]) -> int:
+        # A divider's position in the sorted packets is one more than
+        # the number of packets sorting before it, so no sort is needed
+        first, second = (packet_key(divider) for divider in DIVIDER_PACKETS)
+        first_idx: int = 1
+        second_idx: int = 2
+        for packet in packets:
+            key = packet_key(packet)
+            if key < first:
+                first_idx += 1
+                second_idx += 1
+
+            elif key < second:
+                second_idx += 1
+
+        return first_idx * second_idx
+
+
+# Every character falls into some token, anything unexpected is
+# caught by the final `.` so it can be rejected
+PACKET_TOKEN = re.compile(r"[0-9]+|[\[\],]|\s+|.")
+
+
+def parse_packet(line: str) -> list:
+    """Build the nested lists for a single packet, e.g. `[1,[2,3],[]]`.
+    The line is split into integer, bracket and comma tokens and
+    assembled with an explicit stack. Anything else, including a
+    sign or a second top-level list, raises `ValueError`.
+    """
+    stack: list[list] = []
+    packet: Optional[list] = None
+    # Whether the last token completed an item of the current list
+    after_item = False
+
+    for token in PACKET_TOKEN.findall(line):
+        if token.isspace():
+            continue
+
+        if packet is not None:
+            raise ValueError(f"Trailing data after packet {line=}")
+
+        if token == "[":
+            if after_item:
+                raise ValueError(f"Missing comma in packet {line=}")
+            new_list: list = []
+            if stack:
+                stack[-1].append(new_list)
+            stack.append(new_list)
+            after_item = False
+
+        elif token == "]":
+            if not stack:
+                raise ValueError(f"Unbalanced packet {line=}")
+            if stack[-1] and not after_item:
+                raise ValueError(f"Trailing comma in packet {line=}")
+            closed = stack.pop()
+            if not stack:
+                packet = closed
+            after_item = True
+
+        elif token == ",":
+            if not stack or not after_item:
+                raise ValueError(f"Unexpected comma in packet {line=}")
+            after_item = False
+
+        elif "0" <= token[0] <= "9":
+            if not stack:
+                raise ValueError(f"Integer outside of a packet {line=}")
+            if after_item:
+                raise ValueError(f"Missing comma in packet {line=}")
+            stack[-1].append(int(token))
+            after_item = True
+
+        else:
+            raise ValueError(f"Unexpected {token=} in packet {line=}")
+
+    if packet is None:
+        raise ValueError(f"Failed to parse {line=}")
+
+    return packet
+
+
+def parse_packets(lines: Iterable[str]) -> Iterator[list]:
+    """Lazily parse every packet from an iterable of lines (such as
+    an open file), skipping the blank lines between pairs
+    """
+    for line in lines:
+        if line.strip():
+            yield parse_packet(line)
+
+
+def compare_packets(left: PacketData, right: PacketData) -> int:
+    """Return -1, 0 or 1 as `left` sorts before, alongside or after
+    `right`. An integer compared against a list is treated as a list
+    holding just that integer; neither input is modified.
+    """
+    left_is_int = isinstance(left, int)
+    right_is_int = isinstance(right, int)
+    if left_is_int and right_is_int:
+        return (left > right) - (left < right)
+
+    if left_is_int:
+        left = [left]
+
+    if right_is_int:
+        right = [right]
+
+    for left_item, right_item in zip(left, right):
+        if result := compare_packets(left_item, right_item):
+            return result
+
+    # Whichever list ran out first sorts first
+    return (len(left) > len(right)) - (len(left) < len(right))
 
 
 def packets_are_correctly_ordered(left: list, right: list) -> bool:
-    try:
-        answer = _packets_are_correctly_ordered(left, right)
-    except Pass:
-        answer = True
-    except Fail:
-        answer = False
-
-    return answer
-
-
-def _packets_are_correctly_ordered(left: list, right: list) -> bool:
-    for i in range(len(left)):
-        if len(right) < i + 1:
-            # Right list is exhausted before the left
-            raise Fail
-
-        if isinstance(left[i], int) and isinstance(right[i], int):
-            if left[i] < right[i]:
-                raise Pass
-            elif left[i] > right[i]:
-                raise Fail
-            else:
-                continue
-
-        # Avoid mixed integer and list comparisons
-        if isinstance(left[i], int):
-            left[i] = [left[i]]
-
-        if isinstance(right[i], int):
-            right[i] = [right[i]]
-
-        _packets_are_correctly_ordered(left[i], right[i])
-
-    if len(right) > len(left):
-        # Left list is exhausted before the right
-        raise Pass
-
-    # Completed comparisons
-    return True
+    return compare_packets(left, right) <= 0
+
+
+def _encode_uint(n: int) -> bytes:
+    """Length-prefixed big-endian bytes, which sort in the same
+    order as the integers and never prefix one another
+    """
+    raw = n.to_bytes(max(1, (n.bit_length() + 7) // 8), "big")
+    return bytes([len(raw)]) + raw
+
+
+def packet_key(packet: PacketData) -> bytes:
+    """Encode a packet such that comparing keys as plain bytes gives
+    the same order as `compare_packets`, e.g. for
+    `sorted(packets, key=packet_key)`.
+
+    Because an integer is promoted to a list whenever it meets one,
+    `5`, `[5]` and `[[5]]` all compare equal, so brackets only matter
+    through where lists end. A packet is encoded as a sequence of
+    leaves (integers, or empty lists which sort below any integer
+    and deeper than one another), each followed by the nesting depth
+    left once the lists around it have closed. Closing further out
+    sorts first, matching a list running out before its counterpart.
+    """
+    EMPTY_LIST, INTEGER = b"\x00", b"\x01"
+
+    if isinstance(packet, int):
+        return INTEGER + _encode_uint(packet) + _encode_uint(0)
+
+    key = bytearray()
+    leaf_pending = False
+    just_opened = True
+
+    # Each entry is a list being walked and the index of its next item
+    stack: list[tuple[list, int]] = [(packet, 0)]
+    depth = 1
+    while stack:
+        items, idx = stack[-1]
+        if idx == len(items):
+            stack.pop()
+            if just_opened:
+                key += EMPTY_LIST + _encode_uint(depth)
+                leaf_pending = True
+                just_opened = False
+            depth -= 1
+            continue
+
+        stack[-1] = (items, idx + 1)
+        item = items[idx]
+        if leaf_pending:
+            key += _encode_uint(depth)
+            leaf_pending = False
+
+        if isinstance(item, int):
+            key += INTEGER + _encode_uint(item)
+            leaf_pending = True
+            just_opened = False
+
+        else:
+            stack.append((item, 0))
+            depth += 1
+            just_opened = True
+
+    # Every list has closed by now
+    key += _encode_uint(depth)
+    return bytes(key)
 
 
 def assert_tests():
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 from enum import Enum
+from typing import Iterable
+
 from src.base import Solution
+from src.grid import Coord
 
 
 class CellType(Enum):
@@ -11,165 +14,170 @@ class CellType(Enum):
     SAND = "O"
 
 
-@dataclass
-class Location:
-    x: int
-    y: int
-
-
-@dataclass
-class Cell:
-    contents: CellType
-
-
-class Day14(Solution):
-    name = "14"
+AIR = ord(CellType.AIR.value)
+ROCK = ord(CellType.ROCK.value)
+SAND = ord(CellType.SAND.value)
 
-    def part_one(self, scan: list[str]) -> int:
-        cave, x_offset = create_empty_cave(scan)
-        cave = add_rocks_to_cave(cave, x_offset, scan)
+Location = Coord
+SOURCE = Location(x=500, y=0)
 
-        sand_counter: int = 0
-        cave_full: bool = False
-        while not cave_full:
-            try:
-                cave = add_grain_of_sand(cave, x_offset)
-                sand_counter += 1
 
-            except IndexError:
-                cave_full = True
+@dataclass
+class Cave:
+    """Cave contents stored one byte per cell, row-major. The floor
+    sits two rows below the lowest rock, and the cave is only as wide
+    as sand falling from the source could ever spread before reaching it.
+    """
 
-        return sand_counter
+    width: int
+    height: int
+    x_offset: int
+    lowest_rock: int
+    cells: bytearray
+
+    @classmethod
+    def from_traces(cls, traces: list[list[Location]]) -> Cave:
+        lowest_rock = max(point.y for trace in traces for point in trace)
+        floor = lowest_rock + 2
+
+        # Sand moves at most one column sideways per row it falls
+        width = 2 * floor + 3
+        cave = Cave(
+            width=width,
+            height=floor + 1,
+            x_offset=SOURCE.x - floor - 1,
+            lowest_rock=lowest_rock,
+            cells=bytearray([AIR]) * (width * (floor + 1)),
+        )
+
+        for trace in traces:
+            # A single point trace is a segment from the point to itself
+            for start, end in zip(trace, trace[1:] or trace):
+                for x in range(min(start.x, end.x), max(start.x, end.x) + 1):
+                    for y in range(min(start.y, end.y), max(start.y, end.y) + 1):
+                        cave.add_rock(x, y)
+
+        floor_start = floor * width
+        cave.cells[floor_start : floor_start + width] = bytes([ROCK]) * width
+        return cave
+
+    def index(self, x: int, y: int) -> int:
+        return y * self.width + (x - self.x_offset)
+
+    def add_rock(self, x: int, y: int):
+        if 0 <= x - self.x_offset < self.width:
+            self.cells[self.index(x, y)] = ROCK
+        # Otherwise the rock is out of reach of any sand, skip it
+
+    def pour(self, floor: bool = False) -> int:
+        """Drop sand from the source until a grain falls past the
+        lowest rock (or, with a floor, until the source is buried),
+        returning the number of grains that came to rest.
+
+        The falling grain's trajectory is kept as a stack. Once a
+        grain settles, the next one resumes from the cell above it
+        rather than falling all the way from the source again.
+        """
+        cells = self.cells
+        width = self.width
+        abyss = (self.lowest_rock + 1) * width
+
+        grains: int = 0
+        path: list[int] = [self.index(SOURCE.x, SOURCE.y)]
+        while path:
+            pos = path[-1]
+            if not floor and pos >= abyss:
+                # Past every rock, this grain falls forever
+                break
+
+            below = pos + width
+            if cells[below] == AIR:
+                path.append(below)
+
+            elif cells[below - 1] == AIR:
+                path.append(below - 1)
+
+            elif cells[below + 1] == AIR:
+                path.append(below + 1)
 
-    def part_two(self, scan: list[str]) -> int:
-        cave, x_offset = create_empty_cave(scan, part_two=True)
-        cave = add_rocks_to_cave(cave, x_offset, scan)
+            else:
+                cells[pos] = SAND
+                grains += 1
+                path.pop()
 
-        sand_counter: int = 0
-        cave_full: bool = False
-        while not cave_full:
-            try:
-                cave = add_grain_of_sand(cave, x_offset)
-                sand_counter += 1
+        return grains
 
-                if cave[0][500 - x_offset].contents == CellType.SAND:
-                    cave_full = True
 
-            except IndexError as err:
+def count_sand_with_floor(traces: list[list[Location]]) -> int:
+    """Number of grains that settle once there's a floor, without
+    dropping any of them. With a floor every cell reachable from the
+    source by falling down or diagonally down, around the rock, ends
+    up holding sand. Each row is kept as a Python int bitset, so the
+    next row's reachable cells are the current ones spread one column
+    either way with the rock masked out.
+    """
+    lowest_rock = max(point.y for trace in traces for point in trace)
+    floor = lowest_rock + 2
+
+    # Bit 0 is the furthest left column sand could reach
+    x_offset = SOURCE.x - floor
+    rock_rows = [0] * floor
+    for trace in traces:
+        # A single point trace is a segment from the point to itself
+        for start, end in zip(trace, trace[1:] or trace):
+            lo = max(min(start.x, end.x) - x_offset, 0)
+            hi = min(max(start.x, end.x) - x_offset, 2 * floor)
+            if lo > hi:
+                # Out of reach of any sand
                 continue
 
-        return sand_counter
-
-
-def create_empty_cave(
-    scan: list[str], part_two: bool = False
-) -> tuple[list[list[Cell]], int]:
-    """Return a cave of unoccupied cells along with
-    an x-offset value"""
-    min_x: int = 1_000_000
-    max_x: int = -1
-    max_y: int = -1
-
-    for trace in scan:
-        trace = trace.rstrip()
-        for coords in trace.split(" -> "):
-            x, y = coords.split(",")[:2]
-            min_x = min(int(x), min_x)
-            max_x = max(int(x), max_x)
-            max_y = max(int(y), max_y)
-
-    if part_two:
-        # Expand cave to allow for full pyramid creation
-        max_y += 2
-        width_of_pyramid_base = 2 * max_y - 1
-        min_x = 500 - (width_of_pyramid_base // 2) - 1
-        max_x = 500 + (width_of_pyramid_base // 2) + 1
-
-    cave: list[list[Cell]] = []
-    for _ in range(max_y + 1):
-        cave.append([Cell(contents=CellType.AIR) for _ in range(min_x, max_x + 1)])
-
-    if part_two:
-        # Add an additional layer of rocks along the bottom row
-        for cell in cave[-1]:
-            cell.contents = CellType.ROCK
-
-    return cave, min_x
-
-
-def add_rocks_to_cave(
-    cave: list[list[Cell]], x_offset: int, scan: list[str]
-) -> list[list[Cell]]:
-    for trace in scan:
-        trace = trace.rstrip()
-
-        rock_points: list[Location] = []
-        for coords in trace.split(" -> "):
-            x, y = coords.split(",")[:2]
-            rock_points.append(
-                Location(
-                    x=int(x) - x_offset,
-                    y=int(y),
-                )
-            )
-
-        curr: Location = rock_points[0]
-        cave[curr.y][curr.x].contents = CellType.ROCK
-
-        for new_point in rock_points[1:]:
-            if (x_diff := new_point.x - curr.x) != 0:
-                direction = 1 if x_diff > 0 else -1
-
-                for x in range(1, abs(x_diff) + 1):
-                    cave[curr.y][curr.x + (x * direction)].contents = CellType.ROCK
-
-            else:
-                y_diff = new_point.y - curr.y
-                direction = 1 if y_diff > 0 else -1
-
-                for y in range(1, abs(y_diff) + 1):
-                    cave[curr.y + (y * direction)][curr.x].contents = CellType.ROCK
-
-            curr = new_point
+            span = ((1 << (hi - lo + 1)) - 1) << lo
+            for y in range(min(start.y, end.y), max(start.y, end.y) + 1):
+                rock_rows[y] |= span
 
-    return cave
+    reachable = 1 << (SOURCE.x - x_offset)
+    grains = 1
+    for rock in rock_rows[1:]:
+        reachable = (reachable | (reachable << 1) | (reachable >> 1)) & ~rock
+        grains += bin(reachable).count("1")
 
+    return grains
 
-def add_grain_of_sand(
-    cave: list[list[Cell]], x_offset: int
-) -> tuple[list[list[Cell]], bool]:
-    """Adds a single grain of sand into the cave if possible.
-    Returns the updated cave and a boolean denoted if the
-    cave is full or not.
-    """
-    done: bool = False
-    sand: Location = Location(x=500 - x_offset, y=0)
 
-    max_x = len(cave[0])
-    max_y = len(cave)
-    while not done:
-
-        if cave[sand.y + 1][sand.x].contents == CellType.AIR:
-            sand.y += 1
+@dataclass
+class Day14(Solution):
+    name = "14"
+    # Drop every grain in part two rather than counting reachable cells
+    simulate: bool = False
+
+    def parse(self, scan: Iterable[str]) -> list[list[Location]]:
+        traces: list[list[Location]] = []
+        for trace in scan:
+            trace = trace.rstrip()
+            if not trace:
+                continue
 
-        elif cave[sand.y + 1][sand.x - 1].contents == CellType.AIR:
-            sand.y += 1
-            sand.x -= 1
+            points: list[Location] = []
+            for coords in trace.split(" -> "):
+                x, y = coords.split(",")[:2]
+                points.append(Location(x=int(x), y=int(y)))
+            traces.append(points)
 
-        elif cave[sand.y + 1][sand.x + 1].contents == CellType.AIR:
-            sand.y += 1
-            sand.x += 1
+        return traces
 
-        else:
-            done = True
+    def part_one(self, traces: list[list[Location]]) -> int:
+        return Cave.from_traces(traces).pour()
 
-    cave[sand.y][sand.x].contents = CellType.SAND
-    return cave
+    def part_two(self, traces: list[list[Location]]) -> int:
+        if self.simulate:
+            return Cave.from_traces(traces).pour(floor=True)
+        return count_sand_with_floor(traces)
 
 
-def draw_cave(cave: list[list[Cell]]):
-    for y, row in enumerate(cave):
-        print([cave[y][x].contents.value for x in range(len(row))])
+def draw_cave(cave: Cave):
+    for y in range(cave.height):
+        row = cave.cells[y * cave.width : (y + 1) * cave.width]
+        print(row.decode("ascii"))
 
 
 if __name__ == '__main__':
@@ -1,20 +1,14 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-import hashlib
 import re
+from typing import Iterable, Iterator, Optional, Sequence
 
 from src.base import Solution
+from src.grid import Coord
 
 
-@dataclass
-class Point:
-    x: int
-    y: int
-
-    def __hash__(self) -> int:
-        s = f"{self.x}-{self.y}"
-        return int(hashlib.sha256(bytearray(s, encoding="utf-8")).hexdigest(), 16)
+Point = Coord
 
 
 @dataclass
@@ -27,10 +21,6 @@ class NumericRange:
         """Count total using inclusive bounds"""
         return self.max - self.min + 1
 
-    def merge_other(self, other: NumericRange):
-        self.min = min(self.min, other.min)
-        self.max = max(self.max, other.max)
-
 
 @dataclass
 class ExclusionZone:
@@ -68,9 +58,12 @@ class ExclusionZone:
         row_intersection = self.intersection_of_row(row=point.y)
         return row_intersection.min <= point.x <= row_intersection.max
 
-    def intersection_of_row(self, row: int) -> NumericRange:
+    def intersection_of_row(self, row: int) -> Optional[NumericRange]:
+        """Points of `row` covered by this zone, or None if the
+        zone doesn't reach the row
+        """
         if self.top.y < row or self.bottom.y > row:
-            return NumericRange(min=0, max=0)
+            return None
 
         dist_from_y_extreme = min((row - self.bottom.y), (self.top.y - row))
         total_width = 2 * dist_from_y_extreme + 1
@@ -81,21 +74,174 @@ class ExclusionZone:
         )
 
 
-def count_non_beacon_points(zones: list[ExclusionZone], row: int) -> int:
-    beacons_to_remove: set[Point] = set()
+@dataclass
+class RowCoverage:
+    """Answers coverage queries for any row of the zones using a
+    sorted sweep over the span each sensor covers on that row
+    """
 
-    points_along_row = zones[0].intersection_of_row(row)
-    if zones[0].beacon.y == row:
-        beacons_to_remove.add(zones[0].beacon)
+    # (x, y, dist) of each sensor
+    sensors: list[tuple[int, int, int]]
+    # Beacon x positions, keyed by row
+    beacons: dict[int, set[int]]
 
-    for zone in zones[1:]:
-        new_range = zone.intersection_of_row(row)
-        points_along_row.merge_other(new_range)
+    @classmethod
+    def from_zones(cls, zones: list[ExclusionZone]) -> RowCoverage:
+        beacons: dict[int, set[int]] = {}
+        for zone in zones:
+            beacons.setdefault(zone.beacon.y, set()).add(zone.beacon.x)
+
+        return RowCoverage(
+            sensors=[(zone.center.x, zone.center.y, zone.dist) for zone in zones],
+            beacons=beacons,
+        )
 
-        if zone.beacon.y == row:
-            beacons_to_remove.add(zone.beacon)
+    def spans(self, row: int) -> list[tuple[int, int]]:
+        """Sorted, disjoint inclusive spans of `row` covered by at
+        least one zone
+        """
+        covering = sorted(
+            (x - (dist - abs(row - y)), x + (dist - abs(row - y)))
+            for x, y, dist in self.sensors
+            if dist >= abs(row - y)
+        )
 
-    return points_along_row.n - len(beacons_to_remove)
+        merged: list[tuple[int, int]] = []
+        for lo, hi in covering:
+            if merged and lo <= merged[-1][1] + 1:
+                if hi > merged[-1][1]:
+                    merged[-1] = (merged[-1][0], hi)
+            else:
+                merged.append((lo, hi))
+
+        return merged
+
+    def count(self, row: int) -> int:
+        """Number of points on `row` where a beacon can't be"""
+        covered = sum(hi - lo + 1 for lo, hi in self.spans(row))
+        # Known beacons always sit inside their sensor's zone
+        return covered - len(self.beacons.get(row, ()))
+
+    def gaps(self, row: int, lo: int, hi: int) -> Sequence[tuple[int, int]]:
+        """Inclusive spans of `row` within `lo..hi` covered by no zone"""
+        return _uncovered_spans(self.spans(row), lo, hi)
+
+    def scan_rows(
+        self, rows: Iterable[int], lo: int, hi: int
+    ) -> Iterator[tuple[int, int, Sequence[tuple[int, int]]]]:
+        """Yield (row, non-beacon count, gaps within `lo..hi`) for
+        every row
+        """
+        for row in rows:
+            spans = self.spans(row)
+            covered = sum(span_hi - span_lo + 1 for span_lo, span_hi in spans)
+            count = covered - len(self.beacons.get(row, ()))
+            yield row, count, _uncovered_spans(spans, lo, hi)
+
+
+def _uncovered_spans(
+    spans: list[tuple[int, int]], lo: int, hi: int
+) -> Sequence[tuple[int, int]]:
+    """Complement of sorted, disjoint `spans` within `lo..hi`. Nearly
+    every row is fully covered, so those share an empty tuple rather
+    than each getting a new list.
+    """
+    gaps: Optional[list[tuple[int, int]]] = None
+    x = lo
+    for span_lo, span_hi in spans:
+        if span_hi < x:
+            continue
+        if span_lo > hi:
+            break
+        if span_lo > x:
+            gaps = gaps or []
+            gaps.append((x, span_lo - 1))
+        x = span_hi + 1
+
+    if x <= hi:
+        gaps = gaps or []
+        gaps.append((x, hi))
+
+    return gaps or ()
+
+
+def count_non_beacon_points(zones: list[ExclusionZone], row: int) -> int:
+    return RowCoverage.from_zones(zones).count(row)
+
+
+def find_uncovered_point(
+    zones: list[ExclusionZone], max_coord: int
+) -> Optional[Point]:
+    """Find a point within `0..max_coord` on both axes that no zone
+    covers. A lone uncovered point must sit just outside the edges
+    of several zones, or be pinned against the search bounds, so
+    only the crossings of the diagonal lines bounding each zone (one
+    step further out) with each other and with the bounds, plus the
+    corners, are checked. Sweeping every row is only a last resort.
+    """
+    # Lines of the form y = x + c and y = -x + c, stored as c
+    ascending: set[int] = set()
+    descending: set[int] = set()
+    for zone in zones:
+        reach = zone.dist + 1
+        x, y = zone.center
+        ascending.update((y - x + reach, y - x - reach))
+        descending.update((y + x + reach, y + x - reach))
+
+    for point in _candidate_points(ascending, descending, max_coord):
+        if not (0 <= point.x <= max_coord and 0 <= point.y <= max_coord):
+            continue
+
+        if not any(zone.contains(point) for zone in zones):
+            return point
+
+    return _sweep_rows_for_uncovered_point(zones, max_coord)
+
+
+def _candidate_points(
+    ascending: set[int], descending: set[int], max_coord: int
+) -> Iterator[Point]:
+    """Integer points at or around the crossings of the diagonal
+    lines with each other, then with the search bounds, then the
+    corners of the search area
+    """
+    for a in ascending:
+        for b in descending:
+            x, y = (b - a) // 2, (a + b) // 2
+            if (a + b) % 2 == 0:
+                yield Point(x=x, y=y)
+            else:
+                # The lines cross between integer points, try those
+                # surrounding the crossing
+                yield from (Point(x, y), Point(x + 1, y), Point(x, y + 1))
+                yield Point(x + 1, y + 1)
+
+    for a in ascending:
+        yield Point(x=0, y=a)
+        yield Point(x=max_coord, y=max_coord + a)
+        yield Point(x=-a, y=0)
+        yield Point(x=max_coord - a, y=max_coord)
+
+    for b in descending:
+        yield Point(x=0, y=b)
+        yield Point(x=max_coord, y=b - max_coord)
+        yield Point(x=b, y=0)
+        yield Point(x=b - max_coord, y=max_coord)
+
+    for x in (0, max_coord):
+        for y in (0, max_coord):
+            yield Point(x=x, y=y)
+
+
+def _sweep_rows_for_uncovered_point(
+    zones: list[ExclusionZone], max_coord: int
+) -> Optional[Point]:
+    coverage = RowCoverage.from_zones(zones)
+    for row, _, gaps in coverage.scan_rows(range(max_coord + 1), 0, max_coord):
+        if gaps:
+            return Point(x=gaps[0][0], y=row)
+
+    return None
 
 
 def distance(a: Point, b: Point) -> int:
@@ -113,38 +259,28 @@ def parse_line(line: str) -> tuple[Point, Point]:
     return sensor, beacon
 
 
+@dataclass
 class Day15(Solution):
     name = "15"
+    # Row checked for positions where a beacon can't be
+    row: int = 2_000_000
+    # Largest x or y coordinate the distress beacon can have
+    search_bound: int = 4_000_000
 
-    def part_one(self, position_report: list[str]) -> int:
+    def parse(self, position_report: Iterable[str]) -> list[ExclusionZone]:
         exclusion_zones: list[ExclusionZone] = []
         for line in position_report:
             sensor, beacon = parse_line(line.rstrip())
             exclusion_zones.append(ExclusionZone.create(sensor, beacon))
+        return exclusion_zones
 
-        return count_non_beacon_points(exclusion_zones, row=10)
-
-    def part_two(self, position_report: list[str]) -> int:
-        exclusion_zones: list[ExclusionZone] = []
-        for line in position_report:
-            sensor, beacon = parse_line(line.rstrip())
-            exclusion_zones.append(ExclusionZone.create(sensor, beacon))
+    def part_one(self, exclusion_zones: list[ExclusionZone]) -> int:
+        return count_non_beacon_points(exclusion_zones, row=self.row)
 
-        # shame...
-        max_size = 20
-        point_found: bool = False
-        for x in range(max_size):
-            if point_found:
-                break
-
-            for y in range(max_size):
-                point = Point(x, y)
-                if any(zone.contains(point) for zone in exclusion_zones):
-                    continue
-
-                # Point doesn't intersect any exclusions, this is our spot!
-                point_found = True
-                break
+    def part_two(self, exclusion_zones: list[ExclusionZone]) -> int:
+        point = find_uncovered_point(exclusion_zones, self.search_bound)
+        if point is None:
+            return -1
 
         tuning_freq = (4_000_000 * point.x) + point.y
         return tuning_freq
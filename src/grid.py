@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Iterator, NamedTuple
+
+
+class Coord(NamedTuple):
+    """Immutable 2-d integer coordinate. Being a plain tuple it
+    hashes and compares at native speed and has no per-instance
+    `__dict__`, so it's cheap to keep millions of them in sets.
+    """
+
+    x: int
+    y: int
+
+
+# Bitmap tiles cover 64 x 64 cells
+TILE_BITS = 6
+TILE_MASK = (1 << TILE_BITS) - 1
+TILE_BYTES = (1 << (2 * TILE_BITS)) // 8
+
+
+@dataclass
+class SparseBitmap:
+    """Set of grid cells stored as square tiles of bits, allocated
+    only once a cell inside them is added. Dense walks over an
+    unbounded grid cost roughly one bit per cell touched, rather
+    than a whole object per cell.
+    """
+
+    tiles: dict[tuple[int, int], bytearray] = field(default_factory=dict)
+    _count: int = 0
+
+    def add(self, x: int, y: int) -> bool:
+        """Mark a cell, returning whether it was newly added"""
+        key = (x >> TILE_BITS, y >> TILE_BITS)
+        tile = self.tiles.get(key)
+        if tile is None:
+            tile = self.tiles[key] = bytearray(TILE_BYTES)
+
+        bit = ((y & TILE_MASK) << TILE_BITS) | (x & TILE_MASK)
+        mask = 1 << (bit & 7)
+        if tile[bit >> 3] & mask:
+            return False
+
+        tile[bit >> 3] |= mask
+        self._count += 1
+        return True
+
+    def __contains__(self, cell: tuple[int, int]) -> bool:
+        x, y = cell
+        tile = self.tiles.get((x >> TILE_BITS, y >> TILE_BITS))
+        if tile is None:
+            return False
+
+        bit = ((y & TILE_MASK) << TILE_BITS) | (x & TILE_MASK)
+        return bool(tile[bit >> 3] & (1 << (bit & 7)))
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[Coord]:
+        for (tile_x, tile_y), tile in self.tiles.items():
+            for byte_idx, byte in enumerate(tile):
+                if not byte:
+                    continue
+
+                for offset in range(8):
+                    if byte & (1 << offset):
+                        bit = (byte_idx << 3) | offset
+                        yield Coord(
+                            (tile_x << TILE_BITS) | (bit & TILE_MASK),
+                            (tile_y << TILE_BITS) | (bit >> TILE_BITS),
+                        )
+
+    def update(self, other: SparseBitmap):
+        """Add every cell of `other` to this bitmap"""
+        for key, other_tile in other.tiles.items():
+            tile = self.tiles.get(key)
+            if tile is None:
+                self.tiles[key] = bytearray(other_tile)
+                self._count += _popcount(other_tile)
+                continue
+
+            merged = int.from_bytes(tile, "little") | int.from_bytes(
+                other_tile, "little"
+            )
+            self._count += bin(merged).count("1") - _popcount(tile)
+            tile[:] = merged.to_bytes(TILE_BYTES, "little")
+
+    def union(self, other: SparseBitmap) -> SparseBitmap:
+        merged = SparseBitmap(
+            tiles={key: bytearray(tile) for key, tile in self.tiles.items()},
+            _count=self._count,
+        )
+        merged.update(other)
+        return merged
+
+    __or__ = union
+
+
+def _popcount(tile: bytearray) -> int:
+    return bin(int.from_bytes(tile, "little")).count("1")
@@ -0,0 +1,250 @@
+"""Solve many days, parts and input files concurrently
+
+    python -m src.runner --workers 8 --timeout 60 07 12 "15=inputs/15/*.txt"
+"""
+from __future__ import annotations
+
+import argparse
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from contextlib import redirect_stdout
+from dataclasses import asdict, dataclass
+from glob import glob
+import io
+import json
+import os
+import signal
+import sys
+from time import perf_counter
+from typing import Any, Optional
+
+from src.base import discover_solutions
+
+# Seconds the parent waits beyond a task's timeout before deciding
+# its worker is stuck somewhere SIGALRM can't interrupt, e.g. inside
+# a long running C call, and killing it
+KILL_GRACE = 5.0
+
+
+class TaskTimeout(Exception):
+    ...
+
+
+@dataclass(frozen=True)
+class Task:
+    day: str
+    input_path: Optional[str] = None
+    parts: tuple[int, ...] = (1, 2)
+
+
+@dataclass
+class TaskResult:
+    day: str
+    input_path: str
+    part: int
+    answer: Any = None
+    seconds: float = 0.0
+    error: Optional[str] = None
+    timed_out: bool = False
+
+
+def _raise_timeout(signum, frame):
+    raise TaskTimeout
+
+
+def execute(task: Task, timeout: Optional[float] = None) -> list[TaskResult]:
+    """Parse a single input once and solve each requested part of
+    it, returning one result per part. When a timeout is given the
+    whole task is interrupted once it elapses (POSIX only).
+    """
+    solution = discover_solutions()[task.day](input_path=task.input_path)
+    results = [TaskResult(task.day, solution.path, part) for part in task.parts]
+
+    use_alarm = bool(timeout) and hasattr(signal, "setitimer")
+    if use_alarm:
+        previous = signal.signal(signal.SIGALRM, _raise_timeout)
+
+    pending = list(results)
+    try:
+        try:
+            if use_alarm:
+                signal.setitimer(signal.ITIMER_REAL, timeout)
+
+            # Silence solutions that print (e.g. the Day10 screen)
+            with redirect_stdout(io.StringIO()):
+                parsed = solution.load()
+                while pending:
+                    result = pending[0]
+                    part = solution.part_one if result.part == 1 else solution.part_two
+
+                    start = perf_counter()
+                    try:
+                        result.answer = part(parsed)
+                    except TaskTimeout:
+                        raise
+                    except Exception as err:
+                        result.error = repr(err)
+                    result.seconds = perf_counter() - start
+                    pending.pop(0)
+
+        finally:
+            # Disarm inside the outer `try`, so an alarm going off
+            # just as the work finishes is still caught below
+            if use_alarm:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+
+    except TaskTimeout:
+        for result in pending:
+            if result.answer is not None or result.error is not None:
+                # Finished just before the alarm went off
+                continue
+            result.timed_out = True
+            result.error = f"timed out after {timeout}s"
+
+    except Exception as err:
+        # Failed while reading or parsing, no part could run
+        for result in pending:
+            result.error = repr(err)
+
+    finally:
+        if use_alarm:
+            signal.signal(signal.SIGALRM, previous)
+
+    return results
+
+
+def _failed_results(
+    task: Task, error: str, timed_out: bool = False
+) -> list[TaskResult]:
+    return [
+        TaskResult(
+            task.day, task.input_path or "", part, error=error, timed_out=timed_out
+        )
+        for part in task.parts
+    ]
+
+
+def _collect(task: Task, future: Future) -> list[TaskResult]:
+    try:
+        return future.result()
+    except Exception as err:
+        # Worker died or the day couldn't be found
+        return _failed_results(task, repr(err))
+
+
+def _kill_workers(pool: ProcessPoolExecutor):
+    terminate_workers = getattr(pool, "terminate_workers", None)
+    if terminate_workers is not None:
+        terminate_workers()
+    else:
+        # No public way to stop a busy worker before Python 3.14
+        for process in list((pool._processes or {}).values()):
+            process.terminate()
+    pool.shutdown(wait=True, cancel_futures=True)
+
+
+def run_tasks(
+    tasks: list[Task],
+    workers: Optional[int] = None,
+    timeout: Optional[float] = None,
+) -> list[TaskResult]:
+    """Run every task on a process pool, returning results in the
+    same order as the tasks were given. `workers` defaults to the
+    number of CPUs.
+
+    Only as many tasks as there are workers are in flight at once,
+    so each starts as soon as it's submitted and the parent can hold
+    it to a deadline of its own. A task still running `KILL_GRACE`
+    seconds past its timeout is marked as timed out and the pool is
+    replaced, re-running the tasks that were in flight alongside it.
+    """
+    workers = workers or os.cpu_count() or 1
+    results: list[list[TaskResult]] = [[] for _ in tasks]
+    queued = deque(enumerate(tasks))
+
+    while queued:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        # Each in flight future's task index, task and deadline
+        in_flight: dict[Future, tuple[int, Task, Optional[float]]] = {}
+        stuck = False
+
+        while (queued or in_flight) and not stuck:
+            while queued and len(in_flight) < workers:
+                idx, task = queued.popleft()
+                deadline = perf_counter() + timeout + KILL_GRACE if timeout else None
+                in_flight[pool.submit(execute, task, timeout)] = (idx, task, deadline)
+
+            deadlines = [deadline for *_, deadline in in_flight.values() if deadline]
+            wait_for = max(min(deadlines) - perf_counter(), 0) if deadlines else None
+            done, _ = wait(in_flight, timeout=wait_for, return_when=FIRST_COMPLETED)
+
+            now = perf_counter()
+            for future, (idx, task, deadline) in list(in_flight.items()):
+                if future in done or future.done():
+                    results[idx] = _collect(task, future)
+                    del in_flight[future]
+
+                elif deadline is not None and now >= deadline:
+                    results[idx] = _failed_results(
+                        task, f"worker stuck past {timeout}s timeout", timed_out=True
+                    )
+                    del in_flight[future]
+                    stuck = True
+
+        if stuck:
+            # Killing the pool takes the other in flight tasks with it
+            queued.extendleft(
+                (idx, task) for idx, task, _ in reversed(list(in_flight.values()))
+            )
+            _kill_workers(pool)
+        else:
+            pool.shutdown()
+
+    return [result for task_results in results for result in task_results]
+
+
+def parse_task_specs(specs: list[str], parts: tuple[int, ...]) -> list[Task]:
+    """Expand `DAY` or `DAY=PATH` specs into tasks, where PATH may be
+    a glob matching many input files
+    """
+    tasks: list[Task] = []
+    for spec in specs:
+        day, _, pattern = spec.partition("=")
+        day = day.zfill(2)
+        if not pattern:
+            tasks.append(Task(day=day, parts=parts))
+            continue
+
+        paths = sorted(glob(pattern)) or [pattern]
+        tasks.extend(Task(day=day, input_path=path, parts=parts) for path in paths)
+
+    return tasks
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.runner", description=__doc__)
+    parser.add_argument(
+        "tasks",
+        nargs="*",
+        metavar="DAY[=PATH]",
+        help="days to solve, optionally with an input path or glob (default: all)",
+    )
+    parser.add_argument("--part", type=int, choices=(1, 2), help="only run one part")
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPUs)")
+    parser.add_argument("--timeout", type=float, help="seconds allowed per task")
+    args = parser.parse_args(argv)
+
+    parts = (args.part,) if args.part else (1, 2)
+    specs = args.tasks or list(discover_solutions())
+    results = run_tasks(
+        parse_task_specs(specs, parts), workers=args.workers, timeout=args.timeout
+    )
+
+    for result in results:
+        print(json.dumps(asdict(result), default=repr))
+
+    return 1 if any(result.error for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())